@@ -0,0 +1,223 @@
+"""
+Benchmarks for run_caption_report against the local Canvas/YouTube stub.
+
+Each run scans the stub's synthetic course in a fresh interpreter (so
+import, connection-pool and memo caches start cold) and writes a local
+CSV report; nothing leaves the machine.  For every report stage the run
+records wall time, CPU time, requests served by the stub and peak RSS,
+and repeats are reduced to their median.  Results can be saved as JSON
+and compared with a run from another commit:
+
+    python benchmarks/run_benchmarks.py --scenario small --repeat 3 --json base.json
+    ... check out another commit ...
+    python benchmarks/run_benchmarks.py --scenario small --repeat 3 --compare base.json
+
+``--warm`` measures a second run that reuses the first run's caption
+cache and manifest, i.e. an incremental re-scan.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import warnings
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+from stub_server import SCENARIOS, StubServer  # noqa: E402
+
+METRICS = ("wall_s", "cpu_s", "requests", "peak_rss_mb")
+
+class _RssSampler:
+    """Samples this process's resident set size every ``interval`` seconds"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self.peak = self.current()
+        self._stop = threading.Event()
+
+    def current(self):
+        try:
+            with open("/proc/self/statm") as fh:
+                return int(fh.read().split()[1]) * self.page_size
+        except OSError:
+            import resource  # no /proc: fall back to the process-wide peak
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def take_peak(self):
+        """Peak since the previous call, then start a new window"""
+        peak, self.peak = max(self.peak, self.current()), self.current()
+        return peak
+
+    def stop(self):
+        self._stop.set()
+
+def _stub_requests(canvas_url):
+    with urllib.request.urlopen(f"{canvas_url}/__stats") as r:
+        return json.load(r)["requests"]
+
+def _measure(config):
+    """One benchmark run in this (fresh) process; returns per-stage metrics"""
+    os.environ.update(CANVAS_API_URL=config["canvas_url"], CANVAS_API_KEY="benchmark",
+                      YOUTUBE_API_KEY="benchmark", VAST_CONFIG="")
+    sys.path.insert(0, REPO)
+    warnings.filterwarnings("ignore", message="Canvas may respond unexpectedly")  # the stub is plain HTTP
+    sampler = _RssSampler().start()
+    start = (time.perf_counter(), time.process_time(), _stub_requests(config["canvas_url"]), sampler.take_peak())
+    import caption_report as c
+    c.YT_VIDEO_URL = f"{config['youtube_url']}/videos"
+    c.YT_CAPTION_URL = f"{config['youtube_url']}/captions"
+    marks = [("import", start)]
+
+    def _hook(event, fields):
+        if event in ("stage_start", "course"):
+            marks.append((fields.get("stage"), (time.perf_counter(), time.process_time(),
+                                                _stub_requests(config["canvas_url"]), sampler.take_peak())))
+
+    workdir = tempfile.mkdtemp(prefix="vast-bench-")
+    options = dict(cache_path=os.path.join(workdir, "cache.sqlite3"), manifest_dir=os.path.join(workdir, "manifests"),
+                   output="csv", output_dir=os.path.join(workdir, "reports"), parser=config["parser"],
+                   engine=config["engine"], processes=config["processes"])
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not config["verbose"] else contextlib.nullcontext()
+    with quiet:
+        if config["warm"]:
+            c.run_caption_report(str(config["course_id"]), **options)
+            marks[:] = [("import", (time.perf_counter(), time.process_time(),
+                                    _stub_requests(config["canvas_url"]), sampler.take_peak()))]
+        c.add_trace_hook(_hook)
+        c.run_caption_report(str(config["course_id"]), **options)
+    sampler.stop()
+
+    stages = {}
+    for (stage, before), (_, after) in zip(marks, marks[1:]):
+        stages[stage] = {
+            "wall_s": after[0] - before[0],
+            "cpu_s": after[1] - before[1],
+            "requests": after[2] - before[2],
+            "peak_rss_mb": after[3] / 2 ** 20,
+        }
+    return stages
+
+def _total(stages):
+    return {
+        "wall_s": sum(s["wall_s"] for s in stages.values()),
+        "cpu_s": sum(s["cpu_s"] for s in stages.values()),
+        "requests": sum(s["requests"] for s in stages.values()),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in stages.values()),
+    }
+
+def _median_stages(runs):
+    stages = {}
+    for name in runs[0]:
+        stages[name] = {m: statistics.median(run[name][m] for run in runs if name in run) for m in METRICS}
+    stages["total"] = {m: statistics.median(_total(run)[m] for run in runs) for m in METRICS}
+    return stages
+
+def run_scenario(scenario, repeat=3, engine="threads", parser="html.parser", latency=0.0, jitter=0.0,
+                 quota=700.0, refill=10.0, cost=1.0, warm=False, verbose=False, seed=1, processes=0):
+    """Start a stub for ``scenario`` and run the benchmark ``repeat`` times; returns the median stages"""
+    stub = StubServer(scenario, seed, latency, jitter, quota, refill, cost).start()
+    try:
+        config = dict(canvas_url=stub.canvas_url, youtube_url=stub.youtube_url, course_id=101,
+                      engine=engine, parser=parser, warm=warm, verbose=verbose, processes=processes)
+        runs = []
+        for _ in range(repeat):
+            with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as ex:
+                runs.append(ex.submit(_measure, config).result())
+        throttled = stub.stats()["throttled"]
+    finally:
+        stub.stop()
+    return {"stages": _median_stages(runs), "throttled": throttled}
+
+def _commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _print_table(results, baseline=None):
+    width = 17 if baseline else 9  # room for "(+12%)" after each value
+    print(f"{'scenario':<12} {'stage':<14} " + " ".join(f"{h:>9}".ljust(width)
+                                                      for h in ("wall s", "cpu s", "requests", "peak MB")))
+    for scenario, result in results.items():
+        base = (baseline or {}).get(scenario, {}).get("stages", {})
+        for stage, values in result["stages"].items():
+            cells = []
+            for metric, fmt in zip(METRICS, ("{:9.3f}", "{:9.3f}", "{:9.0f}", "{:9.1f}")):
+                cell = fmt.format(values[metric])
+                old = base.get(stage, {}).get(metric)
+                if old:
+                    cell += f" ({(values[metric] - old) / old:+.0%})"
+                cells.append(cell.ljust(width))
+            print(f"{scenario:<12} {stage:<14} " + " ".join(cells))
+        if result["throttled"]:
+            print(f"{scenario:<12} {'':<14} {result['throttled']} requests throttled by the stub")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark run_caption_report against a local Canvas/YouTube stub")
+    ap.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                    help="scenario profile (repeatable; default: all)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--engine", default="threads", choices=("threads", "async"))
+    ap.add_argument("--parser", default="html.parser", choices=("html.parser", "lxml", "html5lib"))
+    ap.add_argument("--processes", type=int, default=0, help="parse worker processes (0: threads)")
+    ap.add_argument("--latency", type=float, default=0.02, help="seconds added to every stub response")
+    ap.add_argument("--jitter", type=float, default=0.01)
+    ap.add_argument("--quota", type=float, default=700.0, help="Canvas rate-limit bucket (0 disables)")
+    ap.add_argument("--refill", type=float, default=10.0, help="quota regained per second")
+    ap.add_argument("--cost", type=float, default=1.0, help="quota spent per Canvas request")
+    ap.add_argument("--warm", action="store_true", help="measure a re-scan with a warm cache and manifest")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--compare", help="show changes against a --json file from another run")
+    ap.add_argument("--verbose", action="store_true", help="show the report's own progress output")
+    args = ap.parse_args(argv)
+
+    settings = {k: getattr(args, k) for k in ("repeat", "engine", "parser", "processes", "latency", "jitter",
+                                               "quota", "refill", "cost", "warm", "seed")}
+    results = {}
+    for scenario in args.scenario or sorted(SCENARIOS):
+        print(f"⏱️  {scenario} …", file=sys.stderr)
+        results[scenario] = run_scenario(scenario, **{k: v for k, v in settings.items()}, verbose=args.verbose)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            saved = json.load(fh)
+        print(f"Compared with {saved['commit']} ({args.compare})")
+        baseline = saved["results"]
+    _print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"commit": _commit(), "python": platform.python_version(), "platform": platform.platform(),
+                       "settings": settings, "results": results}, fh, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Local stand-in for the Canvas and YouTube APIs used by caption_report.
+
+Serves one synthetic course (pages, assignments, discussions,
+announcements, modules, files with downloadable generated PDFs, and
+media objects) on a Canvas port and
+the YouTube Data API ``videos``/``captions`` endpoints on a second port,
+so the rate governor sees them as different hosts.  Responses follow the
+shapes caption_report reads, with Canvas-style Link pagination and
+X-Rate-Limit-Remaining / X-Request-Cost headers.  Every request waits
+``latency`` seconds (plus up to ``jitter``), and Canvas answers
+403 "Rate Limit Exceeded" once its leaky-bucket quota is drained.
+
+Courses are generated from a scenario profile and a seed, so a profile
+always produces the same course.
+
+Run on its own (prints the ports as one JSON line):
+
+    python benchmarks/stub_server.py --scenario small --latency 0.02
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+COURSE_ID = 101
+
+# Scenario profiles: how much of each kind of content the course holds.
+# "style" pages imitate content pasted from Word: deep span nesting,
+# inline colour styles and mso-* classes in every paragraph.
+SCENARIOS = {
+    "small": dict(pages=20, assignments=10, discussions=5, announcements=5, modules=3, module_items=8,
+                  files=40, youtube=10, media_objects=5, file_links=3, paragraphs=15, style=False),
+    "files_2k": dict(pages=150, assignments=60, discussions=20, announcements=10, modules=20, module_items=25,
+                     files=2000, youtube=40, media_objects=20, file_links=25, paragraphs=20, style=False),
+    "word_pasted": dict(pages=60, assignments=20, discussions=10, announcements=5, modules=4, module_items=10,
+                        files=100, youtube=15, media_objects=10, file_links=4, paragraphs=400, style=True),
+}
+
+MIME_CLASSES = (("pdf", "application/pdf", "pdf"), ("video", "video/mp4", "mp4"),
+                ("audio", "audio/mpeg", "mp3"), ("doc", "application/msword", "docx"),
+                ("image", "image/png", "png"))
+
+def synthetic_pdf(file_id):
+    """
+    A small valid PDF whose accessibility traits (tags, text layer or a
+    scanned-looking image, language, title, page count) follow from
+    ``file_id``
+    """
+    rnd = random.Random(file_id)
+    tagged, text, lang, title = (rnd.random() < p for p in (0.4, 0.8, 0.5, 0.6))
+    pages = rnd.randint(1, 30)
+    catalog = "/Type /Catalog /Pages 2 0 R"
+    if tagged:
+        catalog += " /StructTreeRoot 3 0 R /MarkInfo << /Marked true >>"
+    if lang:
+        catalog += " /Lang (en-US)"
+    if title:
+        catalog += " /ViewerPreferences << /DisplayDocTitle true >>"
+    info = f"/Title (Handout {file_id})" if title else "/Producer (stub)"
+    objects = [f"<< {catalog} >>",
+               "<< /Type /Pages /Kids [{kids}] /Count %d >>" % pages,
+               "<< /Type /StructTreeRoot >>",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+               f"<< {info} >>",
+               "<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+               "/BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream"]
+    kids = []
+    for number in range(pages):
+        if text:
+            content = f"BT /F1 12 Tf 72 720 Td (Page {number + 1} of handout {file_id}) Tj ET"
+        else:
+            content = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+                       "/Resources << /Font << /F1 4 0 R >> /XObject << /Im1 6 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = objects[1].replace("{kids}", " ".join(kids))
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 5 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+class SyntheticCourse:
+    """Deterministic course content for one scenario profile"""
+
+    def __init__(self, scenario="small", seed=1, canvas_url="", **overrides):
+        profile = dict(SCENARIOS[scenario], **overrides)
+        self.profile = profile
+        rnd = random.Random(seed)
+        self.video_ids = ["".join(rnd.choice("abcdefghijkABCDEFGHIJK0123456789_-") for _ in range(11))
+                          for _ in range(profile["youtube"])]
+        self.media_ids = [f"m-{rnd.randrange(16 ** 8):08x}" for _ in range(profile["media_objects"])]
+        self.files = {}
+        for i in range(profile["files"]):
+            mime_class, content_type, ext = MIME_CLASSES[i % len(MIME_CLASSES)]
+            file_id = 5000 + i
+            self.files[file_id] = {
+                "id": file_id, "display_name": f"file-{i}.{ext}", "filename": f"file-{i}.{ext}",
+                "content-type": content_type, "mime_class": mime_class, "size": 1024 * (i + 1),
+                "url": f"{canvas_url}/files/{file_id}/download?download_frd=1&verifier=x{i}",
+                "updated_at": "2026-01-01T00:00:00Z",
+            }
+        self.canvas_url = canvas_url
+        self.captions = {vid: rnd.choice(("standard", "asr", "none", "es")) for vid in self.video_ids}
+        self.media_captions = {mid: rnd.choice(("en", "es", "none")) for mid in self.media_ids}
+
+        self.pages = [self._item(rnd, "page", i) for i in range(profile["pages"])]
+        self.assignments = [self._item(rnd, "assignment", i) for i in range(profile["assignments"])]
+        self.discussions = [self._item(rnd, "discussion", i) for i in range(profile["discussions"])]
+        self.announcements = [self._item(rnd, "announcement", i) for i in range(profile["announcements"])]
+        self.modules = []
+        for m in range(profile["modules"]):
+            items = []
+            for i in range(profile["module_items"]):
+                item_id = 9000 + m * 1000 + i
+                kind = rnd.choice(("ExternalUrl", "File", "Page"))
+                item = {"id": item_id, "module_id": m + 1, "title": f"Item {i}", "type": kind,
+                        "html_url": f"{canvas_url}/courses/{COURSE_ID}/modules/items/{item_id}"}
+                if kind == "ExternalUrl":
+                    item["external_url"] = self._media_url(rnd)
+                elif kind == "File" and self.files:
+                    item["content_id"] = rnd.choice(list(self.files))
+                items.append(item)
+            self.modules.append({"id": m + 1, "name": f"Module {m + 1}", "items": items})
+        self.syllabus = self._body(rnd)
+
+    def _media_url(self, rnd):
+        choice = rnd.random()
+        if choice < 0.5 and self.video_ids:
+            return f"https://www.youtube.com/watch?v={rnd.choice(self.video_ids)}"
+        if choice < 0.7:
+            return f"https://fod.infobase.com/p_ViewVideo.aspx?xtid={rnd.randrange(99999)}"
+        return f"https://example.org/resource/{rnd.randrange(99999)}"
+
+    def _body(self, rnd):
+        profile = self.profile
+        parts = ["<h2>Overview</h2>"]
+        for p in range(profile["paragraphs"]):
+            words = " ".join(rnd.choice(("course", "video", "reading", "week", "module", "lecture", "notes"))
+                             for _ in range(rnd.randrange(8, 40)))
+            if profile["style"]:
+                parts.append(
+                    f'<p class="MsoNormal" style="margin:0in;line-height:115%;mso-pagination:widow-orphan">'
+                    f'<span style="font-size:12.0pt;font-family:Calibri;color:#{rnd.randrange(16 ** 6):06x}">'
+                    f'<span style="mso-bidi-font-weight:bold"><b>{words[:20]}</b></span>{words}'
+                    f'<o:p></o:p></span></p>'
+                )
+            else:
+                parts.append(f"<p>{words}</p>")
+            if p % 7 == 3:
+                parts.append(f'<img src="{self.canvas_url}/courses/{COURSE_ID}/files/1/preview"'
+                             + (' alt="diagram">' if rnd.random() < 0.5 else ">"))
+            if p % 11 == 5:
+                parts.append("<table><tr><td>a</td><td>b</td></tr></table>")
+        for _ in range(profile["file_links"]):
+            if self.files:
+                file_id = rnd.choice(list(self.files))
+                parts.append(
+                    f'<a href="{self.canvas_url}/courses/{COURSE_ID}/files/{file_id}" '
+                    f'data-api-endpoint="{self.canvas_url}/api/v1/courses/{COURSE_ID}/files/{file_id}">'
+                    f'{self.files[file_id]["display_name"]}</a>'
+                )
+        if self.video_ids and rnd.random() < 0.6:
+            vid = rnd.choice(self.video_ids)
+            parts.append(f'<iframe src="https://www.youtube.com/embed/{vid}" title="video"></iframe>')
+        if self.media_ids and rnd.random() < 0.3:
+            mid = rnd.choice(self.media_ids)
+            parts.append(f'<iframe src="{self.canvas_url}/media_objects_iframe/{mid}?type=video"></iframe>')
+        if rnd.random() < 0.3:
+            parts.append(f'<a href="{self._media_url(rnd)}">click here</a>')
+        return "\n".join(parts)
+
+    def _item(self, rnd, kind, i):
+        plural = {"page": "pages", "assignment": "assignments"}.get(kind, "discussion_topics")
+        slug = f"{kind}-{i}"
+        return {
+            "id": i + 1, "url": slug, "title": f"{kind.title()} {i}", "name": f"{kind.title()} {i}",
+            "html_url": f"{self.canvas_url}/courses/{COURSE_ID}/{plural}/{slug if kind == 'page' else i + 1}",
+            "updated_at": f"2026-01-{1 + i % 28:02d}T00:00:00Z",
+            "body": self._body(rnd),
+        }
+
+class _Quota:
+    """Canvas-style leaky bucket: each request costs ``cost`` and the bucket refills at ``refill``/s"""
+
+    def __init__(self, quota, refill, cost):
+        self.quota = quota
+        self.refill = refill
+        self.cost = cost
+        self.remaining = float(quota)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.remaining = min(self.quota, self.remaining + (now - self.stamp) * self.refill)
+            self.stamp = now
+            if self.remaining < self.cost:
+                return False, self.remaining
+            self.remaining -= self.cost
+            return True, self.remaining
+
+class StubServer:
+    """
+    The Canvas and YouTube stand-ins for one SyntheticCourse.  ``start``
+    binds both ports (0 picks free ones); ``stats`` returns request counts
+    by route, which the benchmarks read between stages.
+    """
+
+    def __init__(self, scenario="small", seed=1, latency=0.0, jitter=0.0, quota=700.0, refill=10.0,
+                 cost=1.0, host="127.0.0.1", canvas_port=0, youtube_port=0, **overrides):
+        self.scenario = scenario
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.quota = _Quota(quota, refill, cost) if quota else None
+        self.overrides = overrides
+        self.host = host
+        self.counts = {}
+        self._count_lock = threading.Lock()
+        self._rnd = random.Random(seed)
+        self._ports = (canvas_port, youtube_port)
+        self._servers = []
+        self.course = None
+
+    @property
+    def canvas_url(self):
+        return f"http://{self.host}:{self._servers[0].server_address[1]}"
+
+    @property
+    def youtube_url(self):
+        return f"http://{self.host}:{self._servers[1].server_address[1]}/youtube/v3"
+
+    def start(self):
+        for port, api in zip(self._ports, ("canvas", "youtube")):
+            server = ThreadingHTTPServer((self.host, port), _handler(self, api))
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+        self.course = SyntheticCourse(self.scenario, self.seed, self.canvas_url, **self.overrides)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def count(self, route):
+        with self._count_lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def stats(self):
+        with self._count_lock:
+            counts = dict(self.counts)
+        return {"requests": sum(counts.values()), "throttled": counts.get("throttled", 0), "routes": counts}
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self._rnd.random() * self.jitter)
+
+def _handler(stub, api):
+    class Handler(_StubHandler):
+        pass
+    Handler.stub = stub
+    Handler.api = api
+    return Handler
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub = None
+    api = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.query = parse_qs(parts.query)
+        path = [p for p in parts.path.split("/") if p]
+        if path == ["__stats"]:
+            return self._send_json(self.stub.stats())
+        self.stub.delay()
+        if self.api == "youtube":
+            return self._youtube(path)
+        headers = {}
+        if self.stub.quota is not None:
+            allowed, remaining = self.stub.quota.take()
+            headers = {"X-Rate-Limit-Remaining": f"{max(remaining, 0):.3f}",
+                       "X-Request-Cost": f"{self.stub.quota.cost:.3f}"}
+            if not allowed:
+                self.stub.count("throttled")
+                return self._send(403, b"403 Forbidden (Rate Limit Exceeded)", "text/plain", headers)
+        return self._canvas(path, headers)
+
+    # -- responses ------------------------------------------------------
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data, headers=None, status=200):
+        self._send(status, json.dumps(data).encode("utf-8"), "application/json; charset=utf-8", headers)
+
+    def _not_found(self, headers=None):
+        self._send_json({"errors": [{"message": "The specified resource does not exist."}]}, headers, 404)
+
+    def _first(self, name, default=None):
+        values = self.query.get(name) or self.query.get(f"{name}[]")
+        return values[0] if values else default
+
+    def _paginate(self, items, headers, base):
+        per_page = min(int(self._first("per_page", 10)), 100)
+        page = int(self._first("page", 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        if page * per_page < len(items):
+            query = {k: v for k, v in self.query.items() if k not in ("page", "per_page")}
+            query.update(page=page + 1, per_page=per_page)
+            headers = dict(headers, Link=f'<{self.stub.canvas_url}{base}?{urlencode(query, doseq=True)}>; rel="next"')
+        self._send_json(chunk, headers)
+
+    # -- Canvas ---------------------------------------------------------
+    def _canvas(self, path, headers):
+        course = self.stub.course
+        includes = set(self.query.get("include[]", []) + self.query.get("include", []))
+        if path[:1] == ["files"] and len(path) == 3 and path[2] == "download":
+            self.stub.count("file_download")
+            f = course.files.get(int(path[1])) if path[1].isdigit() else None
+            if f is None:
+                return self._not_found(headers)
+            body = synthetic_pdf(f["id"]) if f["mime_class"] == "pdf" else b"\0" * 1024
+            return self._send(200, body, f["content-type"], headers)
+        if path[:1] == ["media_objects_iframe"] and len(path) > 1:
+            self.stub.count("media_object")
+            locale = course.media_captions.get(path[1])
+            if locale is None:
+                return self._send(404, b"not found", "text/html", headers)
+            tracks = [] if locale == "none" else [{"kind": "subtitles", "locale": locale}]
+            html = f"<html><script>window.ENV = {json.dumps({'media_tracks': tracks}, separators=(',', ':'))}</script></html>"
+            return self._send(200, html.encode("utf-8"), "text/html; charset=utf-8", headers)
+        if path[:3] != ["api", "v1", "courses"] or len(path) < 4 or path[3] != str(COURSE_ID):
+            self.stub.count("other")
+            return self._not_found(headers)
+        rest = path[4:]
+        base = "/" + "/".join(path)
+        self.stub.count(rest[0] if rest else "course")
+        if not rest:
+            data = {"id": COURSE_ID, "name": f"Benchmark {self.stub.scenario}", "course_code": "BENCH"}
+            if "syllabus_body" in includes:
+                data["syllabus_body"] = course.syllabus
+                data["updated_at"] = "2026-01-01T00:00:00Z"
+            return self._send_json(data, headers)
+        kind = rest[0]
+        if kind == "pages":
+            if len(rest) == 2:
+                page = next((p for p in course.pages if p["url"] == rest[1]), None)
+                return self._send_json(self._page(page, True), headers) if page else self._not_found(headers)
+            return self._paginate([self._page(p, "body" in includes) for p in course.pages], headers, base)
+        if kind == "assignments":
+            return self._paginate([self._assignment(a) for a in course.assignments], headers, base)
+        if kind == "discussion_topics":
+            announcements = self._first("only_announcements") in ("true", "True", "1")
+            topics = course.announcements if announcements else course.discussions
+            return self._paginate([self._topic(t) for t in topics], headers, base)
+        if kind == "files":
+            if len(rest) == 2:
+                f = course.files.get(int(rest[1])) if rest[1].isdigit() else None
+                return self._send_json(f, headers) if f else self._not_found(headers)
+            return self._paginate(list(course.files.values()), headers, base)
+        if kind == "media_objects":
+            # Every fifth media object belongs to another course: embeddable, but not listed here
+            excluded = set(self.query.get("exclude[]", []))
+            listed = [self._media_object(mid, course.media_captions[mid], excluded)
+                      for i, mid in enumerate(course.media_ids) if i % 5 != 4]
+            return self._paginate(listed, headers, base)
+        if kind == "modules":
+            if len(rest) == 3 and rest[2] == "items":
+                module = next((m for m in course.modules if str(m["id"]) == rest[1]), None)
+                if module is None:
+                    return self._not_found(headers)
+                return self._paginate(module["items"], headers, base)
+            return self._paginate([{"id": m["id"], "name": m["name"], "position": m["id"]} for m in course.modules],
+                                  headers, base)
+        return self._not_found(headers)
+
+    @staticmethod
+    def _media_object(media_id, locale, excluded):
+        data = {"media_id": media_id, "title": f"{media_id}.mp4", "media_type": "video", "can_add_captions": True}
+        if "tracks" not in excluded:
+            data["media_tracks"] = [] if locale == "none" else [
+                {"kind": "subtitles", "locale": locale, "media_object_id": media_id}]
+        if "sources" not in excluded:
+            data["media_sources"] = [{"url": f"https://stub.invalid/{media_id}.mp4", "content_type": "video/mp4"}]
+        return data
+
+    @staticmethod
+    def _page(page, with_body):
+        data = {k: page[k] for k in ("url", "title", "html_url", "updated_at")}
+        data["page_id"] = page["id"]
+        if with_body:
+            data["body"] = page["body"]
+        return data
+
+    @staticmethod
+    def _assignment(item):
+        return {"id": item["id"], "name": item["name"], "description": item["body"], "course_id": COURSE_ID,
+                "html_url": item["html_url"], "updated_at": item["updated_at"]}
+
+    @staticmethod
+    def _topic(item):
+        return {"id": item["id"], "title": item["title"], "message": item["body"],
+                "html_url": item["html_url"], "updated_at": item["updated_at"]}
+
+    # -- YouTube --------------------------------------------------------
+    def _youtube(self, path):
+        course = self.stub.course
+        endpoint = path[-1] if path else ""
+        self.stub.count(f"youtube_{endpoint}")
+        if endpoint == "videos":
+            ids = (self._first("id") or "").split(",")
+            items = []
+            for vid in ids:
+                if vid in course.captions:
+                    seconds = 60 + sum(map(ord, vid)) % 3600
+                    duration = f"PT{seconds // 3600}H{seconds // 60 % 60}M{seconds % 60}S"
+                    items.append({"id": vid, "contentDetails": {"duration": duration}})
+            return self._send_json({"kind": "youtube#videoListResponse", "items": items})
+        if endpoint == "captions":
+            kind = course.captions.get(self._first("videoId"))
+            if kind is None:
+                return self._send_json({"error": {"code": 404}}, status=404)
+            items = []
+            if kind in ("standard", "asr"):
+                items.append({"snippet": {"language": "en", "trackKind": kind}})
+            elif kind == "es":
+                items.append({"snippet": {"language": "es", "trackKind": "standard"}})
+            return self._send_json({"kind": "youtube#captionListResponse", "items": items})
+        return self._send_json({"error": {"code": 404}}, status=404)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="small")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, at random")
+    ap.add_argument("--quota", type=float, default=700.0, help="Canvas rate-limit bucket (0 disables)")
+    ap.add_argument("--refill", type=float, default=10.0, help="quota regained per second")
+    ap.add_argument("--cost", type=float, default=1.0, help="quota spent per Canvas request")
+    ap.add_argument("--canvas-port", type=int, default=0)
+    ap.add_argument("--youtube-port", type=int, default=0)
+    args = ap.parse_args(argv)
+    stub = StubServer(args.scenario, args.seed, args.latency, args.jitter, args.quota, args.refill, args.cost,
+                      canvas_port=args.canvas_port, youtube_port=args.youtube_port).start()
+    print(json.dumps({"canvas_url": stub.canvas_url, "youtube_url": stub.youtube_url, "course_id": COURSE_ID}),
+          flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
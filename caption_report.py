@@ -1,45 +1,922 @@
 from __future__ import print_function
 import re
+import sys
+import argparse
 import requests
 import concurrent.futures
-from bs4 import BeautifulSoup
-from google.colab import userdata
-import gspread
-from gspread_dataframe import set_with_dataframe
-import pandas as pd
 import math
-from urllib.parse import urljoin, urlparse
+import array
+import bisect
+import collections
+import contextlib
+import functools
+import csv
+import itertools
+import importlib
+from urllib.parse import parse_qs, urljoin, urlparse, urlsplit
 import io
+import os
+import json
+import time
+import sqlite3
+import threading
+import queue
+import multiprocessing
+import hashlib
+import tempfile
+import asyncio
+from types import SimpleNamespace
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 
 # --------------------------------------------------------------
-# 1️⃣ CONSTANTS – your secrets (keep notebook private)
+# 1️⃣ CONSTANTS – secrets
 # --------------------------------------------------------------
-CANVAS_API_URL = userdata.get('CANVAS_API_URL')
-CANVAS_API_KEY = userdata.get('CANVAS_API_KEY')
-YOUTUBE_API_KEY = userdata.get('YOUTUBE_API_KEY')
+# Each secret comes from the environment variable of the same name, then
+# from the JSON config file at VAST_CONFIG, then (in Colab) from the
+# notebook's userdata secrets.  They are read by _configure when a report
+# starts, not at import.  The config file may also add library media
+# providers as {"LIB_MEDIA_PROVIDERS": {"vimeo.com": "Vimeo"}}.
+CONFIG_PATH = os.environ.get(
+    "VAST_CONFIG", os.path.join(os.path.expanduser("~"), ".vast_udoit.json")
+)
+SECRET_NAMES = ("CANVAS_API_URL", "CANVAS_API_KEY", "YOUTUBE_API_KEY")
+
+def _read_config(path=CONFIG_PATH):
+    if path and os.path.exists(path):
+        with open(path) as fh:
+            return json.load(fh)
+    return {}
+
+def _load_secrets(config):
+    try:
+        from google.colab import userdata
+    except ImportError:
+        userdata = None
+    secrets = {}
+    for name in SECRET_NAMES:
+        value = os.environ.get(name) or config.get(name)
+        if not value and userdata is not None:
+            try:
+                value = userdata.get(name)
+            except Exception:
+                value = None  # secret not defined in this notebook
+        secrets[name] = value
+    return secrets
+
+CANVAS_API_URL = CANVAS_API_KEY = YOUTUBE_API_KEY = None
+_configured = False
+
+def _configure(path=CONFIG_PATH):
+    """Load the secrets into the module constants, once; fails naming any that are missing"""
+    global CANVAS_API_URL, CANVAS_API_KEY, YOUTUBE_API_KEY, _configured
+    if _configured:
+        return
+    config = _read_config(path)
+    secrets = _load_secrets(config)
+    missing = [name for name in SECRET_NAMES if not secrets[name]]
+    if missing:
+        raise RuntimeError(f"Missing {', '.join(missing)}: set the environment variable"
+                           f"{'s' if len(missing) > 1 else ''}, add {'them' if len(missing) > 1 else 'it'} "
+                           f"to {path or 'the VAST_CONFIG file'} or, in Colab, to the notebook's secrets")
+    _add_lib_media_providers(config.get("LIB_MEDIA_PROVIDERS", {}))
+    CANVAS_API_URL = secrets["CANVAS_API_URL"]
+    CANVAS_API_KEY = secrets["CANVAS_API_KEY"]
+    YOUTUBE_API_KEY = secrets["YOUTUBE_API_KEY"]
+    _configured = True
 
 YT_CAPTION_URL = "https://www.googleapis.com/youtube/v3/captions"
 YT_VIDEO_URL = "https://www.googleapis.com/youtube/v3/videos"
 
-YT_PATTERN = (
-    r'(?:https?://)?(?:[0-9A-Z-]+.)?(?:youtube|youtu|youtube-nocookie).'
-    r'(?:com|be)/(?:watch\?v=|watch\?.+&v=|embed/|v/|.+\?v=)?([^&=\n%\?]{11})'
+
+# Caption lookups are cached on disk between runs; "Unable to Check"
+# results use the shorter negative TTL so transient failures are retried.
+CACHE_PATH = os.environ.get(
+    "VAST_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".vast_udoit_cache.sqlite3")
+)
+CACHE_TTL = 30 * 24 * 60 * 60          # 30 days
+CACHE_NEGATIVE_TTL = 6 * 60 * 60       # 6 hours
+# Canvas file metadata carries the file's signed download URL, so it is
+# kept only briefly; within a run at most FILE_INDEX_SIZE files stay in memory.
+CANVAS_FILE_TTL = 60 * 60              # 1 hour
+FILE_INDEX_SIZE = int(os.environ.get("VAST_FILE_INDEX_SIZE", 4096))
+
+# Shared HTTP session: pool size follows the worker count, every call gets
+# a (connect, read) timeout and 429/5xx responses are retried with backoff.
+MAX_WORKERS = 10
+BATCH_WORKERS = 4                      # courses scanned at once in batch mode
+BATCH_PROGRESS_PATH = "vast_batch_progress.jsonl"
+
+# Per-course manifests of the last scan, used to skip unchanged content.
+# Bump MANIFEST_VERSION whenever a rule change alters findings.
+MANIFEST_DIR = os.environ.get(
+    "VAST_MANIFEST_DIR", os.path.join(os.path.expanduser("~"), ".vast_udoit_manifests")
+)
+MANIFEST_VERSION = 4
+SCAN_QUEUE_SIZE = 50                   # fetched items waiting for a parser
+HTTP_TIMEOUT = (10, 60)
+HTTP_MAX_RETRIES = 5
+HTTP_BACKOFF = 0.5                     # seconds, doubled on every retry
+HTTP_MAX_BACKOFF = 60
+USER_AGENT = "VAST-UDOIT caption report (python-requests)"
+
+# Canvas refuses calls with 403 "Rate Limit Exceeded" once a client drains
+# its X-Rate-Limit-Remaining quota.  Canvas concurrency is tuned to stay
+# just under that point and throttled calls are retried, not dropped.
+CANVAS_THROTTLE_MARKER = "Rate Limit Exceeded"
+CANVAS_THROTTLE_RETRIES = 20
+CANVAS_LOW_WATER = 0.25                # shrink concurrency below this share of the quota
+CANVAS_HIGH_WATER = 0.5                # and grow it again above this share
+
+# BeautifulSoup tree builder used for every HTML body.  "html.parser" is
+# the pure-Python default; "lxml" (C, libxml2) is several times faster and
+# "html5lib" follows browser error recovery most closely.  The rules only
+# see the BeautifulSoup tree, so all three report the same findings for
+# well-formed content; they can differ on badly broken markup, which each
+# parser repairs in its own way.
+HTML_PARSER = os.environ.get("VAST_HTML_PARSER", "html.parser")
+HTML_PARSERS = ("html.parser", "lxml", "html5lib")
+
+# Parse worker processes.  Parsing and the rules are pure Python, so parser
+# threads share one core; with SCAN_PROCESSES > 0 every HTML body is parsed
+# and checked in that many worker processes instead, started with
+# SCAN_MP_CONTEXT ("fork" is needed when this code was pasted into a
+# notebook rather than imported as a module).
+SCAN_PROCESSES = int(os.environ.get("VAST_SCAN_PROCESSES", "0"))
+SCAN_MP_CONTEXT = os.environ.get("VAST_MP_CONTEXT", "spawn")
+
+# PDF checks.  Course PDFs are streamed to temporary files PDF_DOWNLOADS at
+# a time and analysed with PyPDF2, which is pure Python: in the parse
+# worker processes when there are any (--processes), else in PDF_PROCESSES
+# processes started (with SCAN_MP_CONTEXT) on the first PDF not already
+# cached, and on threads when PDF_PROCESSES is 0, the default: spawning
+# workers costs more than it saves in a notebook or on a small course.
+# Only the first PDF_TEXT_PAGES pages are text-extracted to tell scanned
+# images from real text; files over PDF_MAX_BYTES are left for manual
+# review.
+PDF_DOWNLOADS = 4
+PDF_PROCESSES = int(os.environ.get("VAST_PDF_PROCESSES", "0"))
+PDF_TEXT_PAGES = 5
+PDF_MAX_BYTES = 200 * 2 ** 20
+PDF_CHUNK_BYTES = 1 << 16
+PDF_BOOKMARK_PAGES = 20                # longer documents should have bookmarks
+
+# I/O engine.  "threads" uses the shared requests session above; "async"
+# (needs aiohttp) runs every Canvas and YouTube request on one event loop,
+# at most ASYNC_HOST_LIMIT at a time per host, with Canvas calls paced by
+# a token bucket that slows down as X-Rate-Limit-Remaining drains.
+ENGINES = ("threads", "async")
+ASYNC_HOST_LIMIT = 100
+ASYNC_MAX_IN_FLIGHT = 2000
+CANVAS_RATE = 50                       # requests/second with a healthy quota
+CANVAS_BURST = 100
+CANVAS_RATE_QUOTA = 700                # Canvas's full X-Rate-Limit-Remaining
+
+# Sheets output.  Rows go out in chunks of SHEETS_CHUNK_ROWS, at most one
+# write call per SHEETS_MIN_INTERVAL seconds (Sheets allows 60 writes a
+# minute per user); accessibility findings stream out during the scan and
+# are flushed at least every SHEETS_FLUSH_SECONDS.
+SHEETS_CHUNK_ROWS = 1000
+SHEETS_MIN_INTERVAL = 1.0
+SHEETS_FLUSH_SECONDS = 15
+SHEETS_FORMULA_PREFIXES = ("=", "+", "-", "@")
+# Spreadsheet ids of earlier reports, keyed by course id, so a re-run
+# opens its sheet directly instead of searching Drive by title.
+SHEETS_INDEX_PATH = os.environ.get(
+    "VAST_SHEETS_INDEX", os.path.join(os.path.expanduser("~"), ".vast_udoit_sheets.json")
 )
 
-LIB_MEDIA_URLS = [
-    "fod.infobase.com",
-    "search.alexanderstreet.com",
-    "kanopystreaming-com",
-    "hosted.panopto.com"
-]
+# Report output.  "sheets" writes a Google Sheet; the others write local
+# files under OUTPUT_DIR ("xlsx" one workbook per course with both tabs,
+# "csv", "jsonl" and "parquet" one file per tab).
+OUTPUTS = ("sheets", "csv", "jsonl", "parquet", "xlsx")
+OUTPUT = os.environ.get("VAST_OUTPUT", "sheets")
+OUTPUT_DIR = os.environ.get("VAST_OUTPUT_DIR", "vast_reports")
+VAST_TAB = "VAST Report"
+ACCESSIBILITY_TAB = "Accessibility Issues"
+
+# Library media providers by host; a link to the host or any subdomain of
+# it, directly or through an EZproxy-style proxy, is reported for a manual
+# caption check.  Add providers here or in the config file.
+LIB_MEDIA_PROVIDERS = {
+    "fod.infobase.com": "Films on Demand",
+    "search.alexanderstreet.com": "Alexander Street",
+    "kanopystreaming.com": "Kanopy",
+    "hosted.panopto.com": "Panopto",
+}
+YOUTUBE_HOSTS = ("youtube.com", "youtu.be", "youtube-nocookie.com")
+LINK_CACHE_SIZE = 65536                # classified hrefs kept in memory
+
+# Run metrics.  Stage timings, per-endpoint request counts and latencies,
+# cache hit rates and parse/rule counts are always collected in memory;
+# METRICS_LOG appends them as JSON lines and METRICS_PROM rewrites a
+# Prometheus text file (node_exporter textfile collector format).
+METRICS_LOG = os.environ.get("VAST_METRICS_LOG")
+METRICS_PROM = os.environ.get("VAST_METRICS_PROM")
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)   # seconds
 
 # ----------------------------------------------------------------------
-# CanvasAPI
+# CanvasAPI (imported by the threads engine only)
 # ----------------------------------------------------------------------
-try:
-    from canvasapi import Canvas
-except ImportError as exc:
-    raise ImportError("Please install canvasapi via `!pip install canvasapi`") from exc
+# Errors that mean a Canvas call failed; CanvasException joins once
+# canvasapi is loaded (the async engine raises requests.HTTPError).
+_canvas_errors = (requests.HTTPError,)
+
+def _import_canvasapi():
+    global _canvas_errors
+    try:
+        import canvasapi
+        from canvasapi.exceptions import CanvasException
+    except ImportError as exc:
+        raise ImportError("Please install canvasapi via `!pip install canvasapi`") from exc
+    _canvas_errors = (CanvasException, requests.HTTPError)
+    return canvasapi
+
+# ----------------------------------------------------------------------
+# Shared HTTP session
+# ----------------------------------------------------------------------
+def _is_throttled(response):
+    """True for a response Canvas (or anyone) sent because we are going too fast"""
+    return response.status_code == 429 or (
+        response.status_code == 403 and CANVAS_THROTTLE_MARKER in (response.text or ""))
+
+def _raise_for_status(response):
+    """raise_for_status that names Canvas throttling, so _is_throttle_error can tell it from "no access" """
+    if response.status_code >= 400:
+        reason = f" ({CANVAS_THROTTLE_MARKER})" if _is_throttled(response) else ""
+        raise requests.HTTPError(f"{response.status_code} error{reason} for {response.url}", response=response)
+
+def _header_float(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+class _RateGovernor:
+    """
+    Adaptive cap on concurrent Canvas requests.  Each response reports the
+    quota left (X-Rate-Limit-Remaining) and what the request cost
+    (X-Request-Cost); after subtracting the expected cost of requests still
+    in flight, the cap grows by one while more than CANVAS_HIGH_WATER of the
+    quota is left and shrinks by a quarter (at most once a second) below
+    CANVAS_LOW_WATER.  A throttled response halves the cap and pauses new
+    Canvas requests briefly.
+    """
+
+    def __init__(self, max_limit, quota=CANVAS_RATE_QUOTA):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.quota = quota
+        self.in_flight = 0
+        self.cost = 0.0
+        self._resume_at = 0.0
+        self._shrunk_at = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight >= self.limit:
+                    self._cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+
+    def release(self, response=None):
+        with self._cond:
+            self.in_flight -= 1
+            if response is not None:
+                self._observe(response)
+            self._cond.notify_all()
+
+    def _observe(self, response):
+        now = time.monotonic()
+        if _is_throttled(response):
+            self.limit = max(1, self.limit // 2)
+            self._shrunk_at = now
+            pause = _retry_delay(HTTP_BACKOFF * 2, 0, response.headers.get("Retry-After"))
+            self._resume_at = max(self._resume_at, now + pause)
+            return
+        cost = _header_float(response.headers, "X-Request-Cost")
+        if cost is not None:
+            self.cost = cost if not self.cost else 0.8 * self.cost + 0.2 * cost
+        remaining = _header_float(response.headers, "X-Rate-Limit-Remaining")
+        if remaining is None:
+            return
+        headroom = remaining - self.cost * self.in_flight
+        if headroom < self.quota * CANVAS_LOW_WATER:
+            if now - self._shrunk_at >= 1:
+                self.limit = max(1, self.limit * 3 // 4)
+                self._shrunk_at = now
+        elif headroom > self.quota * CANVAS_HIGH_WATER and self.limit < self.max_limit:
+            self.limit += 1
+
+class _HttpSession(requests.Session):
+    """
+    requests.Session used for every outbound call (Canvas, media objects,
+    YouTube).  Connections are pooled and kept alive, requests get a default
+    timeout, and idempotent requests that fail with a connection error, 429
+    or 5xx are retried with exponential backoff, honouring Retry-After.
+    Canvas requests also pass through a _RateGovernor, and calls Canvas
+    throttles are retried up to CANVAS_THROTTLE_RETRIES times.
+    ``counters()`` reports requests, retries, throttled calls and bytes
+    received since the session was created; the session lives for the
+    whole process, so pass an earlier result as ``since`` to count one run.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, pool_size=MAX_WORKERS, timeout=HTTP_TIMEOUT,
+                 max_retries=HTTP_MAX_RETRIES, backoff=HTTP_BACKOFF):
+        super().__init__()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = 0
+        self._in_flight = None
+        self.canvas_host = urlparse(CANVAS_API_URL).netloc
+        self.governor = _RateGovernor(pool_size)
+        self.resize(pool_size)
+        self.headers["User-Agent"] = USER_AGENT
+        self.canvas_headers = _auth_header(CANVAS_API_KEY)
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+
+    def resize(self, pool_size):
+        """Grow the connection pool so it is at least ``pool_size`` wide"""
+        if pool_size > self.pool_size:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.mount("https://", adapter)
+            self.mount("http://", adapter)
+            self.pool_size = pool_size
+            self.governor.max_limit = pool_size
+
+    def limit(self, max_in_flight):
+        """
+        Cap concurrent requests across every thread using this session.
+        Batch mode uses this as the global network budget shared by all
+        courses being scanned.
+        """
+        self.resize(max_in_flight)
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.governor.max_limit = max_in_flight
+        self.governor.limit = min(self.governor.limit, max_in_flight)
+
+    def counters(self, since=None):
+        with self._stats_lock:
+            return _counters_since(self._stats, since)
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self._stats[name] += value
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        return _retry_delay(self.backoff, attempt, retry_after)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        retryable = method.upper() in self.RETRY_METHODS
+        governor = self.governor if urlparse(url).netloc == self.canvas_host else None
+        attempt = throttles = 0
+        while True:
+            self._count("requests")
+            if governor is not None:
+                governor.acquire()
+            slot = self._in_flight
+            if slot is not None:
+                slot.acquire()
+            response = None
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                _trace("request", method=method, url=url, status=None,
+                       seconds=time.perf_counter() - started, bytes=0)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+            else:
+                if kwargs.get("stream"):
+                    size = int(response.headers.get("Content-Length") or 0)
+                else:
+                    size = len(response.content or b"")
+                self._count("bytes", size)
+                _trace("request", method=method, url=url, status=response.status_code,
+                       seconds=time.perf_counter() - started, bytes=size)
+                if _is_throttled(response) and throttles < CANVAS_THROTTLE_RETRIES:
+                    # Canvas rejected the call unprocessed, so any method may be retried
+                    self._count("throttled")
+                    delay = self._retry_delay(throttles, response)
+                    throttles += 1
+                elif (not retryable or response.status_code not in self.RETRY_STATUSES
+                        or attempt >= self.max_retries):
+                    return response
+                else:
+                    delay = self._retry_delay(attempt, response)
+                    attempt += 1
+                response.close()
+            finally:
+                if slot is not None:
+                    slot.release()
+                if governor is not None:
+                    governor.release(response)
+            self._count("retries")
+            time.sleep(delay)
+
+    def paginate(self, path, params=None):
+        """Iterate a paginated Canvas list endpoint canvasapi does not cover, following Link rel="next" """
+        url = f"{CANVAS_API_URL}/api/v1/{path}"
+        params = list(params or [])
+        if not any(key == "per_page" for key, _ in params):
+            params.append(("per_page", "100"))
+        while url:
+            r = self.get(url, params=params, headers=self.canvas_headers)
+            _raise_for_status(r)
+            yield from r.json()
+            url, params = r.links.get("next", {}).get("url"), None
+
+def _retry_delay(backoff, attempt, retry_after=None):
+    """Seconds to wait before retry ``attempt``: Retry-After if given, else exponential"""
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_MAX_BACKOFF)
+        except ValueError:
+            try:
+                wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                return min(max(wait, 0), HTTP_MAX_BACKOFF)
+            except (TypeError, ValueError):
+                pass
+    return min(backoff * (2 ** attempt), HTTP_MAX_BACKOFF)
+
+def _counters_since(stats, since=None):
+    """Copy of ``stats``, less an earlier copy ``since``"""
+    if since is None:
+        return dict(stats)
+    return {name: value - since.get(name, 0) for name, value in stats.items()}
+
+_http = None
+
+def _get_http(pool_size=MAX_WORKERS):
+    """Return the process-wide HTTP session, creating or widening it as needed"""
+    global _http
+    if _http is None:
+        _http = _HttpSession(pool_size)
+    else:
+        _http.resize(pool_size)
+    return _http
+
+def _make_canvas(http):
+    """Canvas client whose API calls go through the shared HTTP session"""
+    canvas = _import_canvasapi().Canvas(CANVAS_API_URL, CANVAS_API_KEY)
+    canvas._Canvas__requester._session = http
+    return canvas
+
+# ----------------------------------------------------------------------
+# Async I/O engine (engine="async")
+# ----------------------------------------------------------------------
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError as exc:
+        raise ImportError('engine="async" needs aiohttp: `!pip install aiohttp`') from exc
+    return aiohttp
+
+def _check_engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if engine == "async":
+        _import_aiohttp()
+
+class _TokenBucket:
+    """
+    Request pacing for one host.  Tokens refill at ``rate`` per second up
+    to ``capacity``; ``observe`` scales the rate down once Canvas reports
+    less than half of its quota remaining, and back up as it recovers.
+    ``throttle`` halves the ceiling the rate can recover to; it creeps back
+    up while the quota stays healthy.
+    """
+
+    def __init__(self, rate=CANVAS_RATE, capacity=CANVAS_BURST, quota=CANVAS_RATE_QUOTA):
+        self.max_rate = self.base_rate = self.rate = rate
+        self.capacity = self.tokens = capacity
+        self.quota = quota
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def observe(self, remaining):
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return
+        if remaining > self.quota * CANVAS_HIGH_WATER:
+            self.base_rate = min(self.max_rate, self.base_rate + self.max_rate * 0.05)
+        self.rate = self.base_rate * min(1.0, max(2 * remaining / self.quota, 0.05))
+
+    def throttle(self):
+        self.base_rate = max(self.base_rate / 2, self.max_rate * 0.05)
+        self.rate = min(self.rate, self.base_rate)
+
+class _AsyncResponse:
+    """The parts of a finished aiohttp response the scanners need"""
+
+    def __init__(self, url, status_code, headers, text):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        _raise_for_status(self)
+
+    @property
+    def next_url(self):
+        for link in requests.utils.parse_header_links(self.headers.get("Link", "")):
+            if link.get("rel") == "next":
+                return link["url"]
+        return None
+
+class _AsyncHttp:
+    """
+    aiohttp counterpart of _HttpSession.  The session lives on an event loop
+    in its own thread, so any number of requests can be in flight without a
+    thread each; synchronous code waits for a coroutine with ``call`` or
+    schedules one with ``submit`` (a concurrent.futures.Future).  Requests
+    are capped per host, Canvas requests are paced by a _TokenBucket, and
+    429/5xx responses, throttled calls and connection errors are retried as
+    in _HttpSession.
+    """
+
+    RETRY_STATUSES = _HttpSession.RETRY_STATUSES
+
+    def __init__(self, host_limit=ASYNC_HOST_LIMIT, max_in_flight=ASYNC_MAX_IN_FLIGHT,
+                 timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, backoff=HTTP_BACKOFF):
+        self._aiohttp = _import_aiohttp()
+        self.errors = (self._aiohttp.ClientError, asyncio.TimeoutError)
+        self.host_limit = host_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.canvas_host = urlparse(CANVAS_API_URL).netloc
+        self.canvas_headers = _auth_header(CANVAS_API_KEY)
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "bytes": 0}
+        self._hosts = {}
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="vast-async-io", daemon=True)
+        self._thread.start()
+        self.call(self._open(max_in_flight, timeout))
+
+    async def _open(self, max_in_flight, timeout):
+        aiohttp = self._aiohttp
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_in_flight, limit_per_host=0),
+            timeout=aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1]),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self.canvas_bucket = _TokenBucket()
+
+    def call(self, coro):
+        """Run ``coro`` on the event loop and wait for its result"""
+        return self.submit(coro).result()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def gather(self, coros):
+        """Run many coroutines concurrently and wait for all their results, in order"""
+        async def _all():
+            return await asyncio.gather(*coros)
+        return self.call(_all())
+
+    def counters(self, since=None):
+        return _counters_since(self._stats, since)
+
+    async def get(self, url, params=None, headers=None):
+        host = urlparse(url).netloc
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.host_limit)
+        attempt = throttles = 0
+        while True:
+            if host == self.canvas_host:
+                await self.canvas_bucket.acquire()
+            self._stats["requests"] += 1
+            started = time.perf_counter()
+            try:
+                async with slot, self.session.get(url, params=params, headers=headers) as r:
+                    body = await r.read()
+                    response = _AsyncResponse(url, r.status, r.headers, await r.text(errors="replace"))
+            except self.errors:
+                _trace("request", method="GET", url=url, status=None,
+                       seconds=time.perf_counter() - started, bytes=0)
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_delay(self.backoff, attempt)
+                attempt += 1
+            else:
+                self._stats["bytes"] += len(body)
+                _trace("request", method="GET", url=url, status=response.status_code,
+                       seconds=time.perf_counter() - started, bytes=len(body))
+                throttled = _is_throttled(response)
+                if host == self.canvas_host:
+                    if throttled:
+                        self.canvas_bucket.throttle()
+                    else:
+                        self.canvas_bucket.observe(response.headers.get("X-Rate-Limit-Remaining"))
+                if throttled and throttles < CANVAS_THROTTLE_RETRIES:
+                    self._stats["throttled"] += 1
+                    delay = _retry_delay(self.backoff, throttles, response.headers.get("Retry-After"))
+                    throttles += 1
+                elif response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                else:
+                    delay = _retry_delay(self.backoff, attempt, response.headers.get("Retry-After"))
+                    attempt += 1
+            self._stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def get_canvas(self, path, params=None):
+        r = await self.get(f"{CANVAS_API_URL}/api/v1/{path}", params, self.canvas_headers)
+        r.raise_for_status()
+        return r.json()
+
+    def paginate(self, path, params=None):
+        """Iterate a paginated Canvas list endpoint, following Link rel="next" """
+        url = f"{CANVAS_API_URL}/api/v1/{path}"
+        params = list(params or [])
+        if not any(key == "per_page" for key, _ in params):
+            params.append(("per_page", "100"))
+        while url:
+            r = self.call(self.get(url, params, self.canvas_headers))
+            r.raise_for_status()
+            yield from r.json()
+            url, params = r.next_url, None
+
+    def close(self):
+        self.call(self.session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+def _canvas_params(include=None, **kwargs):
+    """canvasapi-style keyword arguments as Canvas query parameters"""
+    if isinstance(include, str):
+        include = [include]
+    params = [("include[]", value) for value in include or []]
+    for key, value in kwargs.items():
+        params.append((key, str(value).lower() if isinstance(value, bool) else str(value)))
+    return params
+
+class _AsyncCanvas:
+    """The slice of canvasapi.Canvas used by run_caption_report, over _AsyncHttp"""
+
+    def __init__(self, aio):
+        self.aio = aio
+
+    def get_course(self, course_id, include=None):
+        data = self.aio.call(self.aio.get_canvas(f"courses/{course_id}", _canvas_params(include)))
+        return _AsyncCourse(self.aio, data)
+
+class _AsyncCourse(SimpleNamespace):
+    """
+    The slice of canvasapi's Course used by the scanners.  List methods
+    page through the REST API on the event loop and return records with the
+    JSON fields as attributes, like canvasapi objects.
+    """
+
+    def __init__(self, aio, data):
+        super().__init__(**data)
+        self._aio = aio
+
+    def _list(self, endpoint, **kwargs):
+        for data in self._aio.paginate(f"courses/{self.id}/{endpoint}", _canvas_params(**kwargs)):
+            yield SimpleNamespace(**data)
+
+    def _get(self, endpoint, **kwargs):
+        return SimpleNamespace(**self._aio.call(
+            self._aio.get_canvas(f"courses/{self.id}/{endpoint}", _canvas_params(**kwargs))))
+
+    def get_pages(self, **kwargs):
+        return self._list("pages", **kwargs)
+
+    def get_page(self, url):
+        return self._get(f"pages/{url}")
+
+    def get_assignments(self, **kwargs):
+        return self._list("assignments", **kwargs)
+
+    def get_discussion_topics(self, **kwargs):
+        return self._list("discussion_topics", **kwargs)
+
+    def get_files(self, **kwargs):
+        return self._list("files", **kwargs)
+
+    def get_file(self, file_id):
+        return self._get(f"files/{file_id}")
+
+    def get_modules(self, **kwargs):
+        for module in self._list("modules", **kwargs):
+            module.get_module_items = (
+                lambda module_id=module.id, **kw: self._list(f"modules/{module_id}/items", **kw))
+            yield module
+
+# ----------------------------------------------------------------------
+# Persistent result cache
+# ----------------------------------------------------------------------
+class _ResultCache:
+    """
+    SQLite-backed cache for caption lookups, keyed by kind and key
+    (e.g. ("youtube", video_id) or ("media_object", url)).
+    With refresh=True reads always miss, so every lookup is re-checked
+    and the fresh result overwrites the stored one.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, negative_ttl=CACHE_NEGATIVE_TTL, refresh=False):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "kind TEXT, key TEXT, value TEXT, expires REAL, PRIMARY KEY (kind, key))"
+            )
+
+    def get(self, kind, key):
+        if self.refresh:
+            _trace("cache", kind=kind, hit=False)
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE kind = ? AND key = ? AND expires > ?",
+                (kind, key, time.time())
+            ).fetchone()
+        _trace("cache", kind=kind, hit=row is not None)
+        return json.loads(row[0]) if row else None
+
+    def set(self, kind, key, value, negative=False, ttl=None):
+        expires = time.time() + (self.negative_ttl if negative else ttl or self.ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (kind, key, value, expires) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), expires)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ----------------------------------------------------------------------
+# Findings store
+# ----------------------------------------------------------------------
+# One media result and one accessibility finding, as the rules record
+# them for a content item (and as manifests save them, as JSON lists).
+_MediaEntry = collections.namedtuple("_MediaEntry", "status hours minutes seconds location file_location")
+_Issue = collections.namedtuple("_Issue", "issue_type severity description location")
+
+# Rows returned by _FindingStore lookups
+_MediaFinding = collections.namedtuple("_MediaFinding", ("course_id", "section", "media") + _MediaEntry._fields)
+_IssueFinding = collections.namedtuple("_IssueFinding", ("course_id",) + _Issue._fields)
+
+# VAST report sections, in report order
+MEDIA_SECTIONS = ("youtube", "media", "linked_files", "library")
+
+class _FindingStore:
+    """
+    Compact, thread-safe store of report findings for one or more courses.
+
+    Every value (course id, media name, status, issue type, severity,
+    description, location, ...) is interned once and a finding is a row of
+    integer ids in array-backed columns, so a finding costs a few bytes
+    per field however often its values repeat.  Media rows are keyed by
+    (course, section, media): adding one again replaces it in place, as
+    the old per-section dicts did.  Lookups filter on any of the fields
+    and go through per-value row lists for the INDEXED fields, so
+    compiling one course of a batch does not scan every other course.
+    """
+
+    MEDIA_INDEXED = ("course_id",)             # key fields, unchanged when a row is replaced
+    ISSUE_INDEXED = ("course_id", "issue_type", "location")
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+        self._lock = threading.Lock()
+        self._media = {field: array.array("I") for field in _MediaFinding._fields}
+        self._media_rows = {}
+        self._media_index = {field: {} for field in self.MEDIA_INDEXED}
+        self._issues = {field: array.array("I") for field in _IssueFinding._fields}
+        self._issue_index = {field: {} for field in self.ISSUE_INDEXED}
+
+    def _intern(self, value):
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def add_media(self, course_id, section, media, entry):
+        with self._lock:
+            ids = [self._intern(value) for value in (course_id, section, media) + tuple(entry)]
+            key = tuple(ids[:3])
+            row = self._media_rows.get(key)
+            if row is None:
+                row = self._media_rows[key] = len(self._media["media"])
+                for column, value_id in zip(self._media.values(), ids):
+                    column.append(value_id)
+                self._index_row(self._media, self._media_index, row)
+            else:
+                for column, value_id in zip(self._media.values(), ids):
+                    column[row] = value_id
+
+    def add_issue(self, course_id, issue):
+        with self._lock:
+            for column, value in zip(self._issues.values(), (course_id,) + tuple(issue)):
+                column.append(self._intern(value))
+            self._index_row(self._issues, self._issue_index, len(self._issues["course_id"]) - 1)
+
+    @staticmethod
+    def _index_row(table, index, row):
+        for field, rows in index.items():
+            value_id = table[field][row]
+            listed = rows.get(value_id)
+            if listed is None:
+                listed = rows[value_id] = array.array("I")
+            listed.append(row)
+
+    def _rows(self, table, index, filters):
+        """
+        (rows, checks): the row numbers worth looking at, in order, and the
+        (column, value id) pairs each must match; None if nothing can match
+        """
+        wanted = []
+        for field, value in filters.items():
+            if value is not None:
+                value_id = self._ids.get(value)
+                if value_id is None:
+                    return None  # never stored, so nothing matches
+                wanted.append((field, value_id))
+        with self._lock:
+            rows = None
+            for field, value_id in wanted:
+                if field in index:
+                    listed = index[field].get(value_id, ())
+                    if rows is None or len(listed) < len(rows):
+                        rows = listed
+            # A copy, or a range bound now: rows added later are not seen
+            rows = range(len(table["course_id"])) if rows is None else array.array("I", rows)
+        return rows, [(table[field], value_id) for field, value_id in wanted]
+
+    def _select(self, table, index, record, filters):
+        found = self._rows(table, index, filters)
+        if found is None:
+            return
+        rows, wanted = found
+        columns = list(table.values())
+        values = self.values
+        for row in rows:
+            if all(column[row] == value_id for column, value_id in wanted):
+                yield record._make(values[column[row]] for column in columns)
+
+    def media(self, course_id=None, section=None, media=None, location=None):
+        """Media findings in the order they were first added"""
+        return self._select(self._media, self._media_index, _MediaFinding,
+                            {"course_id": course_id, "section": section, "media": media, "location": location})
+
+    def issues(self, course_id=None, issue_type=None, severity=None, location=None):
+        """Accessibility findings in the order they were added"""
+        return self._select(self._issues, self._issue_index, _IssueFinding,
+                            {"course_id": course_id, "issue_type": issue_type, "severity": severity,
+                             "location": location})
+
+    def severity_counts(self, course_id=None):
+        found = self._rows(self._issues, self._issue_index, {"course_id": course_id})
+        if found is None:
+            return {}
+        rows, _ = found
+        severities = self._issues["severity"]
+        counts = collections.Counter(severities[row] for row in rows)
+        return {self.values[value_id]: count for value_id, count in counts.items()}
 
 # ----------------------------------------------------------------------
 # Helper Functions
@@ -47,81 +924,753 @@ except ImportError as exc:
 def _auth_header(token: str) -> dict:
     return {"Authorization": f"Bearer {token.strip()}"}
 
+def _is_throttle_error(exc):
+    """True if a Canvas error means "slow down" rather than "not available" """
+    return CANVAS_THROTTLE_MARKER in str(exc)
+
 def _add_entry(d, name, status, page, hour="", minute="", second="", file_location=""):
-    d[name] = [status, hour, minute, second, page, file_location]
+    d[name] = _MediaEntry(status, hour, minute, second, page, file_location)
+
+# Canvas file id in a link's data-api-endpoint, e.g. .../api/v1/courses/1/files/42
+CANVAS_FILE_ENDPOINT_RE = re.compile(r"/files/(\d+)/?$")
+FILE_META_ATTRS = ("id", "display_name", "url", "mime_class", "size", "modified_at", "updated_at")
+
+def _canvas_file_id(endpoint):
+    match = CANVAS_FILE_ENDPOINT_RE.search(endpoint) if endpoint else None
+    return match.group(1) if match else None
+
+class _CourseFileIndex:
+    """In-memory index of a course's files, keyed by file id and MIME class.
+
+    The course file listing is paginated once per run; individual lookups
+    that miss the listing (e.g. files linked from another course) fall back
+    to ``course.get_file``.  ``get_many`` fetches a batch of misses
+    concurrently, each id at most once at a time however many threads ask
+    for it, and with a ``cache`` the fetched metadata is kept between runs
+    for CANVAS_FILE_TTL.  ``by_id`` keeps the ``size`` most recently used
+    files; ``by_mime_class`` maps each MIME class to {file id: file}.
+    The index also records every location that links to a file so each
+    file can be reported once.
+    """
+
+    def __init__(self, course, cache=None, workers=MAX_WORKERS, size=FILE_INDEX_SIZE):
+        self.course = course
+        self.cache = cache
+        self.size = size
+        self.by_id = collections.OrderedDict()
+        self.by_mime_class = {}
+        self.references = {}
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                           thread_name_prefix="vast-files")
+        try:
+            for f in course.get_files():
+                self._add(f)
+        except _canvas_errors as exc:
+            # File listing can be hidden from the token; lookups still work.
+            # Running out of rate limit is not the same as "no access".
+            if _is_throttle_error(exc):
+                raise
+
+    def _add(self, f):
+        with self._lock:
+            self._remember(str(f.id), f)
+            self.by_mime_class.setdefault(f.mime_class, {}).setdefault(str(f.id), f)
+
+    def _remember(self, file_id, f):
+        """Store or refresh an entry (a file, or None if unavailable); call with the lock held"""
+        self.by_id[file_id] = f
+        self.by_id.move_to_end(file_id)
+        if len(self.by_id) > self.size:
+            self.by_id.popitem(last=False)
+
+    def get(self, file_id):
+        return self.get_many([file_id])[str(file_id)]
+
+    def get_many(self, file_ids):
+        """Resolve file ids to file objects (None when unavailable)"""
+        file_ids = [str(file_id) for file_id in file_ids]
+        found, waiting = {}, {}
+        with self._lock:
+            for file_id in file_ids:
+                if file_id in self.by_id:
+                    self.by_id.move_to_end(file_id)
+                    found[file_id] = self.by_id[file_id]
+                    continue
+                future = self._pending.get(file_id)
+                if future is None:
+                    future = self._pending[file_id] = self._pool.submit(self._fetch, file_id)
+                waiting[file_id] = future
+        for file_id, future in waiting.items():
+            found[file_id] = future.result()  # re-raises rate limiting
+        return {file_id: found[file_id] for file_id in file_ids}
+
+    def _fetch(self, file_id):
+        try:
+            cached = self.cache.get("canvas_file", file_id) if self.cache is not None else None
+            if cached is not None:
+                f = SimpleNamespace(**cached) if cached else None
+            else:
+                try:
+                    f = self.course.get_file(file_id)
+                except _canvas_errors as exc:
+                    if _is_throttle_error(exc):
+                        raise
+                    f = None
+                if self.cache is not None:
+                    meta = {name: getattr(f, name, None) for name in FILE_META_ATTRS} if f is not None else {}
+                    self.cache.set("canvas_file", file_id, meta, negative=f is None, ttl=CANVAS_FILE_TTL)
+            if f is not None:
+                self._add(f)
+            else:
+                with self._lock:
+                    self._remember(file_id, None)
+            return f
+        finally:
+            with self._lock:
+                self._pending.pop(file_id, None)
+
+    def close(self):
+        self._pool.shutdown()
+
+    def add_reference(self, file_id, location):
+        locations = self.references.setdefault(str(file_id), [])
+        if location not in locations:
+            locations.append(location)
+
+class _FileRefRecorder:
+    """
+    View of a _CourseFileIndex for a single content item: lookups go to the
+    shared index, references are collected in ``refs`` and applied later so
+    concurrent scans record them in a deterministic order.
+    """
 
-def _check_media_object(url: str):
+    def __init__(self, files, refs):
+        self.files = files
+        self.refs = refs
+
+    def get(self, file_id):
+        return self.files.get(file_id)
+
+    def get_many(self, file_ids):
+        return self.files.get_many(file_ids)
+
+    def add_reference(self, file_id, location):
+        self.refs.append((file_id, location))
+
+def _add_file_entry(link_media, f, location):
+    f_url, mime_class = getattr(f, "url", None), getattr(f, "mime_class", None)
+    if not f_url or not mime_class:
+        return  # Canvas leaves these out for files locked to the token
+    f_url = f_url.split("?")[0]
+    if "audio" in mime_class:
+        _add_entry(link_media, f"Linked Audio File: {f.display_name}",
+                   "Manually Check for Captions", location, file_location=f_url)
+    if "video" in mime_class:
+        _add_entry(link_media, f"Linked Video File: {f.display_name}",
+                   "Manually Check for Captions", location, file_location=f_url)
+
+def _check_media_object(url: str, cache=None):
+    if cache is not None:
+        cached = cache.get("media_object", url)
+        if cached is not None:
+            return (url, cached)
     try:
-        txt = requests.get(url, headers=_auth_header(CANVAS_API_KEY)).text
-        if '"kind":"subtitles"' in txt:
-            return (url, "Captions in English" if '"locale":"en"' in txt else "No English Captions")
-        return (url, "No Captions")
+        http = _get_http()
+        status = _media_object_status(http.get(url, headers=http.canvas_headers).text)
     except requests.RequestException:
-        return (url, "Unable to Check Media Object")
-
-def _process_html(soup, course, page, yt_links, media_links, link_media, lib_media):
-    media_objs, iframe_objs = [], []
+        status = "Unable to Check Media Object"
+    if cache is not None:
+        cache.set("media_object", url, status, negative=status.startswith("Unable"))
+    return (url, status)
+
+async def _check_media_object_async(aio, url, cache=None):
+    """_check_media_object on the async engine"""
+    if cache is not None:
+        cached = cache.get("media_object", url)
+        if cached is not None:
+            return (url, cached)
+    try:
+        status = _media_object_status((await aio.get(url, headers=aio.canvas_headers)).text)
+    except aio.errors:
+        status = "Unable to Check Media Object"
+    if cache is not None:
+        cache.set("media_object", url, status, negative=status.startswith("Unable"))
+    return (url, status)
+
+def _media_object_status(txt):
+    if '"kind":"subtitles"' in txt:
+        return "Captions in English" if '"locale":"en"' in txt else "No English Captions"
+    return "No Captions"
+
+# Media track kinds that count as captions
+CAPTION_TRACK_KINDS = ("subtitles", "captions")
+
+def _media_tracks_status(tracks):
+    """Caption status from a media object's (kind, locale) tracks"""
+    locales = [locale or "" for kind, locale in tracks if kind in CAPTION_TRACK_KINDS]
+    if not locales:
+        return "No Captions"
+    if any(locale == "en" or locale.startswith("en-") for locale in locales):
+        return "Captions in English"
+    return "No English Captions"
+
+class _MediaObjectIndex:
+    """
+    Caption tracks of every media object in a course, keyed by media id,
+    listed in bulk from /api/v1/courses/:id/media_objects (100 objects a
+    page, media sources left out).  ``status(url)`` answers an embed from
+    the index; it returns None for media the course does not list (shared
+    from elsewhere, or a listing Canvas refused), which is then checked
+    by URL.
+    """
 
-    for a in soup.find_all("a"):
-        href = a.get("href")
-        if not href:
-            continue
+    def __init__(self, course_id, http=None, aio=None):
+        self.tracks = {}
+        self.available = True
+        pages = (aio or http).paginate(f"courses/{course_id}/media_objects", [("exclude[]", "sources")])
+        errors = (requests.RequestException, ValueError) + (aio.errors if aio is not None else ())
         try:
-            file_id = a.get("data-api-endpoint").split("/")[-1]
-            f = course.get_file(file_id)
-            f_url = f.url.split("?")[0]
-            if "audio" in f.mime_class:
-                _add_entry(link_media, f"Linked Audio File: {f.display_name}",
-                           "Manually Check for Captions", page, file_location=f_url)
-            if "video" in f.mime_class:
-                _add_entry(link_media, f"Linked Video File: {f.display_name}",
-                           "Manually Check for Captions", page, file_location=f_url)
-        except Exception:
-            pass
+            for obj in pages:
+                self.tracks[obj["media_id"]] = tuple(
+                    (track.get("kind"), track.get("locale")) for track in obj.get("media_tracks") or ())
+        except errors as exc:
+            # Older Canvas, or a token without access: check each embed instead
+            if _is_throttle_error(exc):
+                raise
+            self.available = False
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def status(self, url):
+        tracks = self.tracks.get(_classify_url(url).media_id)
+        return _media_tracks_status(tracks) if tracks is not None else None
+
+class _MediaObjectChecker:
+    """
+    Run-wide background resolver for Canvas media_objects URLs.  URLs of
+    media in the course's _MediaObjectIndex are answered from it at once;
+    any other distinct URL is submitted once to a long-lived pool as soon
+    as a parser finds it, so checks overlap the rest of the scan.
+    ``status`` waits for the result.  With an _AsyncHttp the checks run on
+    its event loop instead.
+    """
+
+    def __init__(self, cache=None, workers=MAX_WORKERS, aio=None, index=None):
+        self.cache = cache
+        self.aio = aio
+        self.index = index
+        self._pool = None if aio is not None else concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, url):
+        with self._lock:
+            if url not in self._futures:
+                status = self.index.status(url) if self.index is not None else None
+                if status is not None:
+                    self._futures[url] = future = concurrent.futures.Future()
+                    future.set_result((url, status))
+                elif self.aio is not None:
+                    self._futures[url] = self.aio.submit(_check_media_object_async(self.aio, url, self.cache))
+                else:
+                    self._futures[url] = self._pool.submit(_check_media_object, url, self.cache)
+
+    def status(self, url):
+        self.submit(url)
+        return self._futures[url].result()[1]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+class _MediaRefRecorder:
+    """
+    Per-item view of a _MediaObjectChecker that also records (url, location);
+    with no checker (in a parse worker process) it only records.
+    """
+
+    def __init__(self, checker, refs):
+        self.checker = checker
+        self.refs = refs
 
-        if re.search(YT_PATTERN, href):
-            yt_links.setdefault(href, []).append(page)
-        elif any(u in href for u in LIB_MEDIA_URLS):
-            _add_entry(lib_media, href, "Manually Check for Captions", page)
-        elif "media_objects" in href:
-            media_objs.append(href)
+    def submit(self, url, location):
+        if self.checker is not None:
+            self.checker.submit(url)
+        self.refs.append((url, location))
+
+# ----------------------------------------------------------------------
+# Link classification
+# ----------------------------------------------------------------------
+LINK_YOUTUBE = "youtube"
+LINK_YOUTUBE_PLAYLIST = "youtube_playlist"
+LINK_LIBRARY = "library"
+LINK_MEDIA_OBJECT = "media_object"
+LINK_OTHER = "other"
+
+# kind is one of the LINK_* values; media_id is the YouTube video or
+# playlist id or the Canvas media id (None if the URL has none) and
+# provider the service's name.
+_Link = collections.namedtuple("_Link", "kind media_id provider")
+_OTHER_LINK = _Link(LINK_OTHER, None, None)
+YOUTUBE_KINDS = (LINK_YOUTUBE, LINK_YOUTUBE_PLAYLIST)
+
+_YOUTUBE_HOST_TABLE = dict.fromkeys(YOUTUBE_HOSTS, True)
+YT_ID_RE = re.compile(r"[0-9A-Za-z_-]{11}")
+YT_ID_PATHS = ("embed", "v", "e", "shorts", "live")
+# Where a Canvas media object URL carries the media id
+MEDIA_OBJECT_PATHS = ("media_objects", "media_objects_iframe")
+MEDIA_ID_PARAMS = ("entryId", "media_id")
+MEDIA_ID_RE = re.compile(r"[0-9a-z]_[0-9A-Za-z]{8}|m-[0-9A-Za-z]+")
+# Query parameters that carry the real target of a redirect or proxy
+# login link (Google ?q=, EZproxy ?url= / ?qurl=)
+REDIRECT_PARAMS = ("url", "qurl", "q", "u")
+
+def _add_lib_media_providers(providers):
+    """Register {host: name} library media providers"""
+    LIB_MEDIA_PROVIDERS.update({host.lower().strip("."): name for host, name in providers.items()})
+    _classify_url.cache_clear()
+
+def _host_suffix_match(host, table):
+    """Value for the longest dot-boundary suffix of ``host`` found in ``table``"""
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        value = table.get(".".join(labels[i:]))
+        if value is not None:
+            return value
+    return None
+
+def _lib_media_provider(host):
+    provider = _host_suffix_match(host, LIB_MEDIA_PROVIDERS)
+    if provider is None and "-" in host:
+        # EZproxy folds the target host into one label:
+        # fod-infobase-com.ezproxy.example.edu
+        provider = _host_suffix_match(host.split(".")[0].replace("-", "."), LIB_MEDIA_PROVIDERS)
+    return provider
+
+def _path_lib_media_provider(path):
+    """Provider whose host is a path segment, as proxies that take the target
+    in the path do: https://lib.example.edu/proxy/fod.infobase.com/...
+    Only dotted segments count: dashed slugs such as
+    how-to-use-hosted-panopto-com are page names, not folded hosts."""
+    for segment in path.lower().split("/"):
+        if "." in segment:
+            provider = _host_suffix_match(segment.rstrip("."), LIB_MEDIA_PROVIDERS)
+            if provider is not None:
+                return provider
+    return None
+
+def _lib_media_digest():
+    """Hash of the provider table, so findings saved under another table are not reused"""
+    return hashlib.sha256(json.dumps(sorted(LIB_MEDIA_PROVIDERS.items())).encode("utf-8")).hexdigest()
+
+def _youtube_link(host, parts):
+    query = parse_qs(parts.query)
+    if "list" in query:
+        return _Link(LINK_YOUTUBE_PLAYLIST, query["list"][0], "YouTube")
+    segments = [s for s in parts.path.split("/") if s]
+    if host.endswith("youtu.be"):
+        candidate = segments[0] if segments else None
+    elif "v" in query:
+        candidate = query["v"][0]
+    elif len(segments) > 1 and segments[0] in YT_ID_PATHS:
+        candidate = segments[1]
+    else:
+        candidate = None
+    video_id = candidate if candidate and YT_ID_RE.fullmatch(candidate) else None
+    return _Link(LINK_YOUTUBE, video_id, "YouTube")
+
+def _media_object_id(parts):
+    """Media id in a Canvas media_objects / media_objects_iframe URL, e.g. m-5Z1K..."""
+    segments = parts.path.split("/")
+    for name, value in zip(segments, segments[1:]):
+        if name in MEDIA_OBJECT_PATHS and MEDIA_ID_RE.fullmatch(value):
+            return value
+    query = parse_qs(parts.query)
+    for param in MEDIA_ID_PARAMS:
+        for value in query.get(param, ()):
+            if MEDIA_ID_RE.fullmatch(value):
+                return value
+    return None
+
+@functools.lru_cache(maxsize=LINK_CACHE_SIZE)
+def _classify_url(url, follow_redirects=True):
+    """
+    Classify a link by host and path: YouTube video or playlist, library
+    media provider, Canvas media object, or other.  Memoized, so the many
+    repeats of a course's links are parsed once.
+    """
+    url = url.strip()
+    if "//" not in url and not url.startswith("/") and "." in url.split("/")[0]:
+        url = "//" + url  # scheme-less "www.youtube.com/watch?v=..."
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").rstrip(".")
+    except ValueError:
+        return _OTHER_LINK
+    if _host_suffix_match(host, _YOUTUBE_HOST_TABLE):
+        return _youtube_link(host, parts)
+    provider = _lib_media_provider(host) if host else None
+    if provider is None:
+        provider = _path_lib_media_provider(parts.path)
+    if provider is not None:
+        return _Link(LINK_LIBRARY, None, provider)
+    if "media_objects" in parts.path:
+        return _Link(LINK_MEDIA_OBJECT, _media_object_id(parts), "Canvas")
+    if follow_redirects and parts.query:
+        query = parse_qs(parts.query)
+        for param in REDIRECT_PARAMS:
+            for target in query.get(param, ()):
+                if target.startswith(("http://", "https://")):
+                    link = _classify_url(target, False)
+                    if link.kind != LINK_OTHER:
+                        return link
+    return _OTHER_LINK
+
+
+# ----------------------------------------------------------------------
+# HTML parsing
+# ----------------------------------------------------------------------
+# BeautifulSoup is imported by the first _check_parser/_parse_html call,
+# which binds these names for the rule engine.
+BeautifulSoup = FeatureNotFound = Tag = CData = NavigableString = PreformattedString = None
+
+def _import_bs4():
+    global BeautifulSoup, FeatureNotFound, Tag, CData, NavigableString, PreformattedString
+    if BeautifulSoup is not None:
+        return
+    from bs4 import FeatureNotFound, Tag
+    from bs4.element import CData, NavigableString, PreformattedString
+    TEXT_STRING_TYPES.update((NavigableString, CData))
+    from bs4 import BeautifulSoup  # bound last: it marks the import as done
+
+def _check_parser(parser):
+    """Validate a parser backend name, failing early if it is not installed"""
+    if parser not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser {parser!r}; choose one of {', '.join(HTML_PARSERS)}")
+    _import_bs4()
+    try:
+        BeautifulSoup("", parser)
+    except FeatureNotFound as exc:
+        raise ImportError(f"HTML parser {parser!r} is not installed (pip install {parser})") from exc
+    return parser
+
+def _parse_html(html: str, parser=HTML_PARSER):
+    """Parse an HTML body straight from str, with no encode/decode round trip"""
+    if BeautifulSoup is None:
+        _import_bs4()
+    started = time.perf_counter()
+    soup = BeautifulSoup(html, parser)
+    _trace("parse", parser=parser, bytes=len(html), seconds=time.perf_counter() - started)
+    return soup
+
+# ----------------------------------------------------------------------
+# Single-pass DOM rule engine
+# ----------------------------------------------------------------------
+class _Document:
+    """Per-document context shared by the rules walking one HTML fragment"""
+
+    def __init__(self, location, files=None, cache=None, yt_links=None, media_links=None,
+                 link_media=None, lib_media=None, accessibility_issues=None, media_checker=None):
+        self.location = location
+        self.files = files
+        self.cache = cache
+        self.media_checker = media_checker
+        self.yt_links = yt_links
+        self.media_links = media_links
+        self.link_media = link_media
+        self.lib_media = lib_media
+        self.accessibility_issues = accessibility_issues
+        self.media_objects = []
+
+class _Rule:
+    """
+    Base class for rules run by _walk_rules.
+
+    ``start(el)`` is called for every element whose name is in ``tags``
+    (every element when ``tags`` is None), ``end(el)`` when an element
+    named in ``end_tags`` (again None for all) has been fully walked, and
+    ``text(s)`` for each string node -- text, comments, script bodies --
+    when ``strings`` is set.  Rules keep their own per-document
+    state and queue their output with ``later``/``issue``; ``finish`` runs
+    the queue after the walk, rule by rule, so findings come out in the
+    same order as running each check separately.
+    """
+
+    tags = ()
+    end_tags = ()
+    strings = False
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.ops = []
+
+    def later(self, fn, *args):
+        self.ops.append((fn, args))
+
+    def issue(self, issue_type, description, severity="Error"):
+        self.later(_add_accessibility_issue, self.doc.accessibility_issues,
+                   issue_type, description, self.doc.location, severity)
+
+    def start(self, el):
+        pass
+
+    def end(self, el):
+        pass
 
-    for frm in soup.find_all("iframe"):
+    def text(self, s):
+        pass
+
+    def finish(self):
+        for fn, args in self.ops:
+            fn(*args)
+
+    def findings(self):
+        """Results this rule produced for the document, for the walk trace event"""
+        return len(self.ops)
+
+def _walk_rules(soup, rules):
+    """Walk ``soup`` once, dispatching each node to the rules registered for it"""
+    if BeautifulSoup is None:
+        _import_bs4()  # soup built by the caller, not by _parse_html
+    starts, ends, every, every_end, texts = {}, {}, [], [], []
+    for rule in rules:
+        if rule.tags is None:
+            every.append(rule)
+        else:
+            for tag in rule.tags:
+                starts.setdefault(tag, []).append(rule)
+        if rule.end_tags is None:
+            every_end.append(rule)
+        else:
+            for tag in rule.end_tags:
+                ends.setdefault(tag, []).append(rule)
+        if rule.strings:
+            texts.append(rule)
+
+    seen = {}  # elements walked by tag name, for the per-rule dispatch counts
+    strings = 0
+    nodes = [(soup, iter(soup.contents))]
+    while nodes:
+        parent, children = nodes[-1]
+        child = next(children, None)
+        if child is None:
+            nodes.pop()
+            if parent is not soup:
+                for rule in ends.get(parent.name, ()):
+                    rule.end(parent)
+                for rule in every_end:
+                    rule.end(parent)
+            continue
+        if isinstance(child, Tag):
+            seen[child.name] = seen.get(child.name, 0) + 1
+            for rule in starts.get(child.name, ()):
+                rule.start(child)
+            for rule in every:
+                rule.start(child)
+            nodes.append((child, iter(child.contents)))
+        else:
+            strings += 1
+            for rule in texts:
+                rule.text(child)
+
+    elements = sum(seen.values())
+    counts = []
+    for rule in rules:
+        rule.finish()
+        dispatches = elements if rule.tags is None else sum(seen.get(tag, 0) for tag in rule.tags)
+        counts.append((type(rule).__name__.lstrip("_"), dispatches + (strings if rule.strings else 0),
+                       rule.findings()))
+    _trace("walk", location=rules[0].doc.location if rules else None, elements=elements, strings=strings,
+           rules=counts)
+
+class _AnchorMediaRule(_Rule):
+    """Linked Canvas files, YouTube, library media and media objects in <a>"""
+    tags = ("a",)
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.file_ids = []
+        self.resolved = {}
+
+    def start(self, a):
+        href = a.get("href")
+        if not href:
+            return
+        doc = self.doc
+        # Only Canvas file links are looked up, all at once in finish()
+        file_id = _canvas_file_id(a.get("data-api-endpoint"))
+        if file_id is not None:
+            self.file_ids.append(file_id)
+            self.later(self._file_entry, file_id)
+
+        kind = _classify_url(href).kind
+        if kind in YOUTUBE_KINDS:
+            self.later(_add_yt_link, doc.yt_links, href, doc.location)
+        elif kind == LINK_LIBRARY:
+            self.later(_add_entry, doc.lib_media, href, "Manually Check for Captions", doc.location)
+        elif kind == LINK_MEDIA_OBJECT:
+            doc.media_objects.append(href)
+
+    def _file_entry(self, file_id):
+        f = self.resolved.get(file_id)
+        if f is not None:
+            self.doc.files.add_reference(f.id, self.doc.location)
+            _add_file_entry(self.doc.link_media, f, self.doc.location)
+
+    def finish(self):
+        if self.file_ids:
+            self.resolved = self.doc.files.get_many(self.file_ids)
+        super().finish()
+
+class _IframeMediaRule(_Rule):
+    """YouTube, library media and media objects embedded with <iframe>"""
+    tags = ("iframe",)
+
+    def start(self, frm):
         src = frm.get("src")
         if not src:
-            continue
-        if re.search(YT_PATTERN, src):
-            yt_links.setdefault(src, []).append(page)
-        elif any(u in src for u in LIB_MEDIA_URLS):
-            _add_entry(lib_media, src, "Manually Check for Captions", page)
-        elif "media_objects_iframe" in src:
-            iframe_objs.append(src)
-
-    all_media = list(set(media_objs + iframe_objs))
-    if all_media:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as ex:
-            for url, msg in ex.map(_check_media_object, all_media):
-                _add_entry(media_links, url, msg, page)
-
-    for vid in soup.find_all("video"):
-        if vid.get("data-media_comment_id"):
-            name = f"Video Media Comment {vid['data-media_comment_id']}"
-            status = "Captions" if vid.find("track") else "No Captions"
-            _add_entry(media_links, name, status, page)
-
-    for src in soup.find_all("source"):
+            return
+        doc = self.doc
+        kind = _classify_url(src).kind
+        if kind in YOUTUBE_KINDS:
+            self.later(_add_yt_link, doc.yt_links, src, doc.location)
+        elif kind == LINK_LIBRARY:
+            self.later(_add_entry, doc.lib_media, src, "Manually Check for Captions", doc.location)
+        elif kind == LINK_MEDIA_OBJECT:
+            doc.media_objects.append(src)
+
+class _MediaObjectRule(_Rule):
+    """
+    Check the caption status of the media objects found by the link rules.
+    With a media checker the URLs are handed to the run-wide background
+    stage; otherwise they are checked here before the walk returns.
+    """
+
+    def finish(self):
+        doc = self.doc
+        all_media = list(dict.fromkeys(doc.media_objects))
+        if doc.media_checker is not None:
+            for url in all_media:
+                doc.media_checker.submit(url, doc.location)
+        elif all_media:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+                for url, msg in ex.map(lambda u: _check_media_object(u, doc.cache), all_media):
+                    _add_entry(doc.media_links, url, msg, doc.location)
+
+    def findings(self):
+        return len(set(self.doc.media_objects))
+
+class _CommentMediaRule(_Rule):
+    """Video/audio media comments and whether they carry a <track>"""
+    tags = ("video", "track")
+    end_tags = ("video",)
+    label = "Video"
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.found = []
+        self.open = []
+
+    def start(self, el):
+        if el.name == "track":
+            for rec in self.open:
+                if rec is not None:
+                    rec[1] = True
+            return
+        rec = [el, False] if el.get("data-media_comment_id") else None
+        self.found.append(rec)
+        self.open.append(rec)
+
+    def end(self, el):
+        self.open.pop()
+
+    def entry(self, el, has_track):
+        name = f"{self.label} Media Comment {el['data-media_comment_id']}"
+        _add_entry(self.doc.media_links, name, "Captions" if has_track else "No Captions", self.doc.location)
+
+    def finish(self):
+        for rec in self.found:
+            if rec is not None:
+                self.entry(*rec)
+
+    def findings(self):
+        return sum(rec is not None for rec in self.found)
+
+class _SourceMediaRule(_Rule):
+    """Embedded Canvas MP4 <source> elements"""
+    tags = ("source",)
+
+    def start(self, src):
         if src.get("type") == "video/mp4":
             name = f"Embedded Canvas Video {src['src']}"
-            _add_entry(media_links, name, "Manually Check for Captions", page)
+            self.later(_add_entry, self.doc.media_links, name, "Manually Check for Captions", self.doc.location)
+
+class _AudioMediaRule(_CommentMediaRule):
+    """Audio media comments and other embedded Canvas audio"""
+    tags = ("audio", "track")
+    end_tags = ("audio",)
+    label = "Audio"
+
+    def start(self, el):
+        super().start(el)
+        if el.name == "audio" and self.found[-1] is None:
+            self.found[-1] = el
+
+    def finish(self):
+        for rec in self.found:
+            if isinstance(rec, list):
+                self.entry(*rec)
+            else:
+                name = f"Embedded Canvas Audio {rec.get('src', '')}"
+                _add_entry(self.doc.media_links, name, "Manually Check for Captions", self.doc.location)
 
-    for aud in soup.find_all("audio"):
-        if aud.get("data-media_comment_id"):
-            name = f"Audio Media Comment {aud['data-media_comment_id']}"
-            status = "Captions" if aud.find("track") else "No Captions"
-            _add_entry(media_links, name, status, page)
-        else:
-            name = f"Embedded Canvas Audio {aud.get('src', '')}"
-            _add_entry(media_links, name, "Manually Check for Captions", page)
+    def findings(self):
+        return len(self.found)
+
+# Media extraction rules, in the order their findings are reported
+MEDIA_RULES = [
+    _AnchorMediaRule, _IframeMediaRule, _MediaObjectRule,
+    _CommentMediaRule, _SourceMediaRule, _AudioMediaRule,
+]
+
+def _add_yt_link(yt_links, href, location):
+    yt_links.setdefault(href, []).append(location)
+
+def _process_html(soup, files, page, yt_links, media_links, link_media, lib_media, cache=None):
+    doc = _Document(page, files, cache, yt_links, media_links, link_media, lib_media)
+    _walk_rules(soup, [rule(doc) for rule in MEDIA_RULES])
+
+def _process_module_item(item, files, mod_url, yt_links, link_media, lib_media):
+    if item.type == "ExternalUrl":
+        href = item.external_url
+        kind = _classify_url(href).kind
+        if kind in YOUTUBE_KINDS:
+            yt_links.setdefault(href, []).append(mod_url)
+        elif kind == LINK_LIBRARY:
+            _add_entry(lib_media, href, "Manually Check for Captions", mod_url)
+    if item.type == "File":
+        f = files.get(item.content_id)
+        if f is not None:
+            files.add_reference(f.id, mod_url)
+            _add_file_entry(link_media, f, mod_url)
+
+def _pages_with_bodies(course):
+    """
+    List every wiki page together with its body.  Bodies are requested in
+    bulk with include[]=body; only pages the listing returns without a body
+    are fetched individually, concurrently.  Returns [(page, body), ...].
+    """
+    pages = list(course.get_pages(include=["body"], per_page=100))
+    missing = [p for p in pages if not hasattr(p, "body")]
+    bodies = {}
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            for p, full in zip(missing, ex.map(lambda p: course.get_page(p.url), missing)):
+                bodies[p.url] = getattr(full, "body", None)
+    return [(p, p.body if hasattr(p, "body") else bodies[p.url]) for p in pages]
 
 # ----------------------------------------------------------------------
 # YouTube Helpers
@@ -141,33 +1690,128 @@ def _parse_iso8601(duration: str):
             sec = val
     return h, m, sec
 
-def _check_youtube(task):
-    key, vid, pages, api_key = task
-    if not vid:
-        return key, "this is a playlist, check individual videos", ("", "", ""), pages
+YT_BATCH_SIZE = 50  # max ids accepted by one videos?part=contentDetails call
+
+def _fetch_youtube_durations(video_ids, api_key):
+    """Look up durations for many videos, YT_BATCH_SIZE ids per request"""
+    durations = {}
+    for i in range(0, len(video_ids), YT_BATCH_SIZE):
+        batch = video_ids[i:i + YT_BATCH_SIZE]
+        try:
+            r = _get_http().get(YT_VIDEO_URL, params={
+                "part": "contentDetails", "id": ",".join(batch), "key": api_key
+            })
+            for item in r.json().get("items", []):
+                durations[item["id"]] = _parse_iso8601(item["contentDetails"]["duration"])
+        except Exception:
+            # Videos missing from durations are reported as unable to check
+            pass
+    return durations
+
+def _youtube_caption_status(vid, api_key):
     try:
-        r1 = requests.get(f"{YT_VIDEO_URL}?part=contentDetails&id={vid}&key={api_key}")
-        dur = r1.json()["items"][0]["contentDetails"]["duration"]
-        h, m, s = _parse_iso8601(dur)
-
-        r2 = requests.get(f"{YT_CAPTION_URL}?part=snippet&videoId={vid}&key={api_key}")
-        caps = r2.json().get("items", [])
-        status = "No Captions"
-        if caps:
-            langs = {c["snippet"]["language"]: c["snippet"]["trackKind"] for c in caps}
-            if "en" in langs or "en-US" in langs:
-                kind = langs.get("en") or langs.get("en-US")
-                if kind == "standard":
-                    status = "Captions found in English"
-                elif kind == "asr":
-                    status = "Automatic Captions in English"
-                else:
-                    status = "Captions in English (unknown kind)"
-            else:
-                status = "No Captions in English"
-        return key, status, (h, m, s), pages
+        r = _get_http().get(f"{YT_CAPTION_URL}?part=snippet&videoId={vid}&key={api_key}")
+        caps = r.json().get("items", [])
     except Exception:
-        return key, "Unable to Check Youtube Video", ("", "", ""), pages
+        return None
+    return _caption_tracks_status(caps)
+
+def _youtube_lookups(video_ids, api_key):
+    """Durations and caption statuses for ``video_ids``: ({vid: (h, m, s)}, {vid: status})"""
+    durations = _fetch_youtube_durations(video_ids, api_key)
+    lookups = list(durations)
+    captions = {}
+    if lookups:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            captions = dict(zip(lookups, ex.map(lambda v: _youtube_caption_status(v, api_key), lookups)))
+    return durations, captions
+
+async def _youtube_lookups_async(aio, video_ids, api_key):
+    """_youtube_lookups on the async engine: every batch and caption lookup at once"""
+    async def _durations(batch):
+        try:
+            r = await aio.get(YT_VIDEO_URL, {"part": "contentDetails", "id": ",".join(batch), "key": api_key})
+            return {item["id"]: _parse_iso8601(item["contentDetails"]["duration"])
+                    for item in r.json().get("items", [])}
+        except Exception:
+            return {}
+
+    async def _captions(vid):
+        try:
+            r = await aio.get(YT_CAPTION_URL, {"part": "snippet", "videoId": vid, "key": api_key})
+            caps = r.json().get("items", [])
+        except Exception:
+            return None
+        return _caption_tracks_status(caps)
+
+    durations = {}
+    batches = [video_ids[i:i + YT_BATCH_SIZE] for i in range(0, len(video_ids), YT_BATCH_SIZE)]
+    for found in await asyncio.gather(*(_durations(b) for b in batches)):
+        durations.update(found)
+    lookups = list(durations)
+    captions = dict(zip(lookups, await asyncio.gather(*(_captions(v) for v in lookups))))
+    return durations, captions
+
+def _caption_tracks_status(caps):
+    status = "No Captions"
+    if caps:
+        langs = {c["snippet"]["language"]: c["snippet"]["trackKind"] for c in caps}
+        if "en" in langs or "en-US" in langs:
+            kind = langs.get("en") or langs.get("en-US")
+            if kind == "standard":
+                status = "Captions found in English"
+            elif kind == "asr":
+                status = "Automatic Captions in English"
+            else:
+                status = "Captions in English (unknown kind)"
+        else:
+            status = "No Captions in English"
+    return status
+
+def _check_youtube_batch(tasks, cache=None, aio=None):
+    """
+    Resolve many (key, video_id, pages, api_key) tasks at once.
+    Video ids are de-duplicated across keys, cached results are reused,
+    durations are fetched in batches and captions are looked up once per
+    unique video, on ``aio``'s event loop when given.  Returns a list of
+    (key, status, (h, m, s), pages) in task order.
+    """
+    resolved, unique = {}, {}
+    for _, vid, _, api_key in tasks:
+        if not vid or vid in resolved:
+            continue
+        cached = cache.get("youtube", vid) if cache is not None else None
+        if cached is not None:
+            resolved[vid] = (cached[0], tuple(cached[1:]))
+        else:
+            unique.setdefault(api_key, {})[vid] = None
+
+    for api_key, vids in unique.items():
+        if aio is not None:
+            durations, captions = aio.call(_youtube_lookups_async(aio, list(vids), api_key))
+        else:
+            durations, captions = _youtube_lookups(list(vids), api_key)
+        for vid in vids:
+            status = captions.get(vid)
+            if status is None:
+                resolved[vid] = ("Unable to Check Youtube Video", ("", "", ""))
+            else:
+                resolved[vid] = (status, durations[vid])
+            if cache is not None:
+                status, hms = resolved[vid]
+                cache.set("youtube", vid, [status, *hms], negative=status.startswith("Unable"))
+
+    results = []
+    for key, vid, pages, api_key in tasks:
+        if not vid:
+            results.append((key, "this is a playlist, check individual videos", ("", "", ""), pages))
+        else:
+            status, hms = resolved[vid]
+            results.append((key, status, hms, pages))
+    return results
+
+def _check_youtube(task, cache=None, aio=None):
+    return _check_youtube_batch([task], cache, aio)[0]
 
 # ----------------------------------------------------------------------
 # Time handling and totaling functions
@@ -212,623 +1856,2091 @@ def _minutes_to_duration(total_minutes):
 # ACCESSIBILITY TESTING FUNCTIONS
 # ----------------------------------------------------------------------
 
-def _add_accessibility_issue(issues_dict, issue_type, description, location, severity="Error"):
-    """Add an accessibility issue to the tracking dictionary"""
-    key = f"{issue_type}: {description}"
-    if key not in issues_dict:
-        issues_dict[key] = []
-    issues_dict[key].append({
-        'severity': severity,
-        'location': location,
-        'description': description
-    })
+def _add_accessibility_issue(issues, issue_type, description, location, severity="Error"):
+    """Record an accessibility issue in a content item's list of findings"""
+    issues.append(_Issue(issue_type, severity, description, location))
 
-def _check_images_accessibility(soup, location, accessibility_issues):
+class _ImagesRule(_Rule):
     """Check for image accessibility issues"""
-    images = soup.find_all('img')
-    
-    for img in images:
+    tags = ("img",)
+
+    def start(self, img):
         src = img.get('src', '')
         alt = img.get('alt')
         
         # Check for missing alt text
         if alt is None:
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Missing Alt Text",
                 f"Image missing alt attribute: {src[:50]}...",
-                location,
                 "Error"
             )
         elif alt.strip() == "":
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Empty Alt Text",
                 f"Image has empty alt text: {src[:50]}...",
-                location,
                 "Suggestion"
             )
         elif len(alt) > 125:
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Long Alt Text",
                 f"Alt text exceeds 125 characters ({len(alt)} chars): {alt[:50]}...",
-                location,
                 "Suggestion"
             )
         
         # Check for images that might be decorative but have alt text
         if alt and any(word in alt.lower() for word in ['image', 'picture', 'photo', 'graphic']):
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Generic Alt Text",
                 f"Alt text may be too generic: '{alt}'",
-                location,
                 "Suggestion"
             )
 
-def _check_links_accessibility(soup, location, accessibility_issues):
+VAGUE_LINK_TEXT = {
+    'click here', 'read more', 'more', 'here', 'link', 'this', 'continue',
+    'go', 'next', 'previous', 'back', 'download', 'view', 'see more'
+}
+
+class _LinksRule(_Rule):
     """Check for link accessibility issues"""
-    links = soup.find_all('a')
-    
-    vague_link_text = [
-        'click here', 'read more', 'more', 'here', 'link', 'this', 'continue',
-        'go', 'next', 'previous', 'back', 'download', 'view', 'see more'
-    ]
-    
-    for link in links:
+    tags = ("a",)
+
+    def start(self, link):
         href = link.get('href', '')
         link_text = link.get_text(strip=True).lower()
         
         # Check for empty link text
         if not link_text:
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Empty Link Text",
                 f"Link has no text content: {href[:50]}...",
-                location,
                 "Error"
             )
         
         # Check for vague link text
-        elif link_text in vague_link_text:
-            _add_accessibility_issue(
-                accessibility_issues,
+        elif link_text in VAGUE_LINK_TEXT:
+            self.issue(
                 "Vague Link Text",
                 f"Link text is not descriptive: '{link_text}' -> {href[:50]}...",
-                location,
                 "Error"
             )
         
         # Check for URLs as link text
         elif link_text.startswith(('http://', 'https://', 'www.')):
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "URL as Link Text",
                 f"URL used as link text: {link_text[:50]}...",
-                location,
                 "Suggestion"
             )
         
         # Check for very long link text
         elif len(link_text) > 100:
-            _add_accessibility_issue(
-                accessibility_issues,
+            self.issue(
                 "Long Link Text",
                 f"Link text is very long ({len(link_text)} chars): {link_text[:50]}...",
-                location,
                 "Suggestion"
             )
 
-def _check_headings_accessibility(soup, location, accessibility_issues):
+class _HeadingsRule(_Rule):
     """Check for heading structure issues"""
-    headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-    
-    if not headings:
-        return
-    
-    heading_levels = []
-    for heading in headings:
-        level = int(heading.name[1])
-        heading_levels.append(level)
+    tags = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.heading_levels = []
+
+    def start(self, heading):
+        self.heading_levels.append(int(heading.name[1]))
         
         # Check for empty headings
-        heading_text = heading.get_text(strip=True)
-        if not heading_text:
-            _add_accessibility_issue(
-                accessibility_issues,
+        if not heading.get_text(strip=True):
+            self.issue(
                 "Empty Heading",
                 f"Empty {heading.name.upper()} heading found",
-                location,
                 "Error"
             )
-    
-    # Check for skipped heading levels
-    if heading_levels:
-        for i in range(1, len(heading_levels)):
-            current_level = heading_levels[i]
-            prev_level = heading_levels[i-1]
-            
+
+    def finish(self):
+        # Check for skipped heading levels
+        levels = self.heading_levels
+        for prev_level, current_level in zip(levels, levels[1:]):
             if current_level > prev_level + 1:
-                _add_accessibility_issue(
-                    accessibility_issues,
+                self.issue(
                     "Skipped Heading Level",
                     f"Heading level jumps from H{prev_level} to H{current_level}",
-                    location,
                     "Error"
                 )
+        super().finish()
 
-def _check_color_accessibility(soup, location, accessibility_issues):
-    """Check for color-related accessibility issues"""
-    # Look for elements that might rely on color alone
-    elements_with_style = soup.find_all(attrs={'style': True})
-    
-    for element in elements_with_style:
-        style = element.get('style', '').lower()
-        
-        # Check for color-only emphasis
-        if 'color:' in style and element.get_text(strip=True):
-            text_content = element.get_text(strip=True)
+# Strings that count towards get_text(); comments, script and style
+# bodies are excluded, as in BeautifulSoup's own default.  Filled with
+# {NavigableString, CData} by _import_bs4.
+TEXT_STRING_TYPES = set()
+
+EMPHASIS_TAGS = ('strong', 'b', 'em', 'i', 'u')
+EMPHASIS_MARKUP = ['<strong>', '<b>', '<em>', '<i>', '<u>']
+RAW_TEXT_TAGS = ('script', 'style')
+
+class _ColorRule(_Rule):
+    """
+    Check for color-related accessibility issues.
+
+    Every element gets a frame while it is open holding the first 50
+    characters of its stripped text and whether it contains emphasis
+    markup; frames are folded into their parent when the element closes, so
+    each subtree is summarised once and the check is linear in document
+    size.  "Contains emphasis" matches what searching the serialized
+    element for <strong>, <b>, <em>, <i> or <u> used to: an attribute-less
+    emphasis tag, or one of those strings inside unescaped content
+    (comments, CDATA, script/style bodies).
+    """
+    tags = None
+    end_tags = None
+    strings = True
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.frames = []
+        self.found = []
+
+    def start(self, element):
+        # frame: [text parts, text length, contains emphasis, finding]
+        finding = None
+        style = element.get('style')
+        if style is not None and 'color:' in style.lower():
+            finding = [None]
+            self.found.append(finding)
+        self.frames.append([[], 0, False, finding])
+
+    def text(self, s):
+        frame = self.frames[-1] if self.frames else None
+        if frame is None:
+            return
+        if type(s) in TEXT_STRING_TYPES and frame[1] < 50:
+            stripped = s.strip()
+            if stripped:
+                frame[0].append(stripped)
+                frame[1] += len(stripped)
+        if isinstance(s, PreformattedString) or (s.parent is not None and s.parent.name in RAW_TEXT_TAGS):
+            # Serialized verbatim, so markup inside it counted as emphasis
+            lowered = s.lower()
+            if any(tag in lowered for tag in EMPHASIS_MARKUP):
+                frame[2] = True
+
+    def end(self, element):
+        parts, _, has_emphasis, finding = self.frames.pop()
+        text = "".join(parts)[:50]
+        if finding is not None:
+            text_content = text
+            if element.name in RAW_TEXT_TAGS or element.name == 'template':
+                # These elements count their own body as text
+                text_content = element.get_text(strip=True)[:50]
             # Check if this might be used for emphasis without other indicators
-            if not any(tag in str(element).lower() for tag in ['<strong>', '<b>', '<em>', '<i>', '<u>']):
-                _add_accessibility_issue(
-                    accessibility_issues,
+            if text_content and not has_emphasis:
+                finding[0] = text_content
+        if self.frames:
+            parent = self.frames[-1]
+            if parent[1] < 50 and text:
+                parent[0].append(text)
+                parent[1] += len(text)
+            if has_emphasis or (element.name.lower() in EMPHASIS_TAGS and not element.attrs):
+                parent[2] = True
+
+    def finish(self):
+        # Check for color-only emphasis, in document order
+        for (text_content,) in self.found:
+            if text_content:
+                self.issue(
                     "Color Only Emphasis",
                     f"Text may rely on color alone for meaning: '{text_content[:50]}...'",
-                    location,
                     "Suggestion"
                 )
+        super().finish()
 
-def _check_tables_accessibility(soup, location, accessibility_issues):
+class _TablesRule(_Rule):
     """Check for table accessibility issues"""
-    tables = soup.find_all('table')
-    
-    for table in tables:
-        # Check for missing table headers
-        headers = table.find_all(['th'])
-        if not headers:
-            _add_accessibility_issue(
-                accessibility_issues,
-                "Missing Table Headers",
-                "Table found without proper header cells (th elements)",
-                location,
-                "Error"
-            )
-        
-        # Check for missing caption
-        caption = table.find('caption')
-        if not caption:
-            _add_accessibility_issue(
-                accessibility_issues,
-                "Missing Table Caption",
-                "Table missing descriptive caption",
-                location,
-                "Suggestion"
-            )
-        
-        # Check for complex tables without proper scope
-        rows = table.find_all('tr')
-        if len(rows) > 3:  # Arbitrary threshold for "complex"
-            headers_with_scope = table.find_all('th', attrs={'scope': True})
-            if headers and not headers_with_scope:
-                _add_accessibility_issue(
-                    accessibility_issues,
-                    "Missing Header Scope",
-                    "Complex table headers missing scope attributes",
-                    location,
+    tags = ("table", "th", "tr", "caption")
+    end_tags = ("table",)
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.tables = []
+        self.open = []
+
+    def start(self, el):
+        if el.name == "table":
+            # [has th, has scoped th, has caption, row count]
+            table = [False, False, False, 0]
+            self.tables.append(table)
+            self.open.append(table)
+            return
+        # Cells, rows and captions count towards every enclosing table
+        for table in self.open:
+            if el.name == "th":
+                table[0] = True
+                if el.get('scope') is not None:
+                    table[1] = True
+            elif el.name == "caption":
+                table[2] = True
+            else:
+                table[3] += 1
+
+    def end(self, el):
+        self.open.pop()
+
+    def finish(self):
+        for has_headers, has_scope, has_caption, rows in self.tables:
+            # Check for missing table headers
+            if not has_headers:
+                self.issue(
+                    "Missing Table Headers",
+                    "Table found without proper header cells (th elements)",
+                    "Error"
+                )
+            
+            # Check for missing caption
+            if not has_caption:
+                self.issue(
+                    "Missing Table Caption",
+                    "Table missing descriptive caption",
                     "Suggestion"
                 )
-
-def _check_lists_accessibility(soup, location, accessibility_issues):
+            
+            # Check for complex tables without proper scope
+            if rows > 3:  # Arbitrary threshold for "complex"
+                if has_headers and not has_scope:
+                    self.issue(
+                        "Missing Header Scope",
+                        "Complex table headers missing scope attributes",
+                        "Suggestion"
+                    )
+        super().finish()
+
+LIST_LIKE_RE = re.compile(r'^\d+\.')
+
+class _ListsRule(_Rule):
     """Check for list accessibility issues"""
-    # Find improperly structured lists (using line breaks instead of list elements)
-    text_content = soup.get_text()
-    lines = text_content.split('\n')
-    
-    # Look for patterns that suggest lists but aren't marked up as such
-    potential_list_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if stripped and (
-            stripped.startswith(('•', '-', '*', '1.', '2.', '3.', '4.', '5.')) or
-            re.match(r'^\d+\.', stripped) or
-            stripped.startswith(('Step ', 'First', 'Second', 'Third', 'Next', 'Finally'))
-        ):
-            potential_list_lines.append(stripped)
-    
-    if len(potential_list_lines) >= 2:
+    tags = ("ul", "ol")
+    strings = True
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.parts = []
+        self.has_lists = False
+
+    def start(self, el):
+        self.has_lists = True
+
+    def text(self, s):
+        if type(s) in TEXT_STRING_TYPES:
+            self.parts.append(s)
+
+    def finish(self):
+        # Find improperly structured lists (using line breaks instead of list elements)
+        lines = "".join(self.parts).split('\n')
+        
+        # Look for patterns that suggest lists but aren't marked up as such
+        potential_list_lines = []
+        for line in lines:
+            stripped = line.strip()
+            if stripped and (
+                stripped.startswith(('•', '-', '*', '1.', '2.', '3.', '4.', '5.')) or
+                LIST_LIKE_RE.match(stripped) or
+                stripped.startswith(('Step ', 'First', 'Second', 'Third', 'Next', 'Finally'))
+            ):
+                potential_list_lines.append(stripped)
+        
         # Check if there are actual lists nearby
-        lists = soup.find_all(['ul', 'ol'])
-        if not lists:
-            _add_accessibility_issue(
-                accessibility_issues,
+        if len(potential_list_lines) >= 2 and not self.has_lists:
+            self.issue(
                 "Improper List Structure",
                 f"Content appears to be a list but not marked up as such: {potential_list_lines[0][:30]}...",
-                location,
                 "Suggestion"
             )
+        super().finish()
 
-def _check_pdf_accessibility(course, location, accessibility_issues):
-    """Check PDF files for accessibility issues"""
+def _import_pypdf():
     try:
-        # Get files from the course
-        files = course.get_files()
-        for file_obj in files:
-            if file_obj.mime_class == 'pdf':
-                _add_accessibility_issue(
-                    accessibility_issues,
-                    "PDF File Detected",
-                    f"PDF file requires manual accessibility review: {file_obj.display_name}",
-                    location,
-                    "Needs Review"
-                )
-    except Exception as e:
-        # If we can't access files, just note it
-        pass
-
-def _check_media_accessibility(soup, location, accessibility_issues):
+        import PyPDF2
+    except ImportError as exc:
+        raise ImportError("PDF checks need PyPDF2: `!pip install PyPDF2`") from exc
+    return PyPDF2
+
+def _pdf_has_images(page):
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is None:
+        return False
+    xobjects = xobjects.get_object()
+    return any(xobjects[name].get_object().get("/Subtype") == "/Image" for name in xobjects)
+
+def _analyze_pdf(path, text_pages=PDF_TEXT_PAGES):
+    """
+    Accessibility properties of the PDF at ``path``: tag structure, text
+    layer on the first ``text_pages`` pages, language, title and
+    bookmarks.  Runs in a parse worker process when there is one, so the
+    result is plain data.
+    """
+    props = {"pages": 0, "encrypted": False, "tagged": False, "lang": None, "title": None,
+             "display_title": False, "bookmarks": 0, "checked_pages": 0, "text_pages": 0,
+             "image_pages": 0, "error": None}
+    try:
+        reader = _import_pypdf().PdfReader(path)
+        if reader.is_encrypted:
+            props["encrypted"] = True
+            if not reader.decrypt(""):
+                return props
+        root = reader.trailer["/Root"].get_object()
+        props["pages"] = len(reader.pages)
+        props["tagged"] = "/StructTreeRoot" in root
+        lang = root.get("/Lang")
+        props["lang"] = (str(lang).strip() or None) if lang is not None else None
+        title = reader.metadata.title if reader.metadata is not None else None
+        props["title"] = (str(title).strip() or None) if title is not None else None
+        prefs = root.get("/ViewerPreferences")
+        props["display_title"] = bool(prefs is not None and prefs.get_object().get("/DisplayDocTitle"))
+        props["bookmarks"] = len(reader.outline)
+        for number in range(min(text_pages, props["pages"])):
+            page = reader.pages[number]
+            props["checked_pages"] += 1
+            if page.extract_text().strip():
+                props["text_pages"] += 1
+            elif _pdf_has_images(page):
+                props["image_pages"] += 1
+    except Exception as exc:  # malformed files raise all sorts of errors from PyPDF2
+        props["error"] = f"{type(exc).__name__}: {exc}"[:200]
+    return props
+
+def _pdf_findings(props, name):
+    """(issue_type, description, severity) for one analysed PDF"""
+    if props.get("error"):
+        return [("PDF Could Not Be Checked", f"{name}: {props['error']}; review it manually", "Needs Review")]
+    if props["encrypted"] and not props["pages"]:
+        return [("Encrypted PDF", f"{name} is password protected, so assistive technology may not open it",
+                 "Error")]
+    found = []
+    if props["image_pages"] and not props["text_pages"]:
+        # Pages with neither text nor images are blank, not scanned
+        found.append(("Scanned PDF", f"{name} has images but no text on its first {props['checked_pages']} "
+                      "page(s) (a scan?); run OCR and tag it", "Error"))
+    if not props["tagged"]:
+        found.append(("Untagged PDF", f"{name} has no tag structure, so screen readers cannot follow its "
+                      "headings, lists or reading order", "Error"))
+    if not props["lang"]:
+        found.append(("PDF Missing Language", f"{name} does not set a document language", "Error"))
+    if not props["title"]:
+        found.append(("PDF Missing Title", f"{name} has no document title", "Error"))
+    elif not props["display_title"]:
+        found.append(("PDF Title Not Displayed", f"{name} shows its file name instead of its title "
+                      "(DisplayDocTitle is not set)", "Suggestion"))
+    if props["pages"] > PDF_BOOKMARK_PAGES and not props["bookmarks"]:
+        found.append(("PDF Missing Bookmarks", f"{name} has {props['pages']} pages but no bookmarks", "Suggestion"))
+    if not found:
+        found.append(("PDF File Detected", f"{name} passed the automated checks; review its reading order "
+                      "and alternative text manually", "Needs Review"))
+    return found
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def _get_pdf_pool():
+    """The process-wide PDF analysis pool, started on first use; None if PDF_PROCESSES is 0 or it broke"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None and PDF_PROCESSES > 0:
+            _pdf_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=PDF_PROCESSES, mp_context=multiprocessing.get_context(SCAN_MP_CONTEXT))
+        return _pdf_pool or None
+
+def _run_pdf_analysis(path, pool=None):
+    """_analyze_pdf in ``pool``, the PDF pool, or (if neither can run it) this process"""
+    global _pdf_pool
+    own = pool is None
+    if own:
+        pool = _get_pdf_pool()
+    if pool is not None:
+        try:
+            return pool.submit(_analyze_pdf, path).result()
+        except concurrent.futures.process.BrokenProcessPool:
+            if own:
+                # e.g. code pasted into a notebook, which spawned workers cannot import
+                with _pdf_pool_lock:
+                    if _pdf_pool:
+                        print("⚠️  PDF worker processes failed; analysing PDFs on threads.")
+                        _pdf_pool = False
+    return _analyze_pdf(path)
+
+def _pdf_cache_key(f):
+    """File id plus the size and modification time Canvas reports, or None if it reports neither"""
+    size, modified = getattr(f, "size", None), getattr(f, "modified_at", None) or getattr(f, "updated_at", None)
+    return f"{f.id}:{size}:{modified}" if size is not None or modified is not None else None
+
+def _download_pdf(http, f, max_bytes=PDF_MAX_BYTES):
+    """Stream a Canvas file to a temporary file, chunk by chunk; returns (path, sha256 hex digest)"""
+    fd, path = tempfile.mkstemp(prefix="vast-", suffix=".pdf")
+    digest, size = hashlib.sha256(), 0
+    try:
+        with os.fdopen(fd, "wb") as out, http.get(f.url, headers=http.canvas_headers, stream=True) as r:
+            _raise_for_status(r)
+            for chunk in r.iter_content(PDF_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"larger than {max_bytes // 2 ** 20} MB")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+def _pdf_properties(f, http, cache=None, pool=None, downloads=None):
+    """
+    _analyze_pdf results for one course file.  A file whose id, size and
+    modification time are cached is not downloaded again, and content
+    already analysed under another file id (e.g. in a copied course) is
+    recognised by its checksum.
+    """
+    key = _pdf_cache_key(f)
+    cached = cache.get("pdf", key) if cache is not None and key is not None else None
+    if cached is not None:
+        return cached
+    if (getattr(f, "size", None) or 0) > PDF_MAX_BYTES:
+        return {"error": f"larger than {PDF_MAX_BYTES // 2 ** 20} MB"}
+    try:
+        with downloads or contextlib.nullcontext():
+            path, digest = _download_pdf(http, f)
+    except (requests.RequestException, ValueError, OSError) as exc:
+        if _is_throttle_error(exc):
+            raise
+        return {"error": f"download failed ({exc})"}
+    try:
+        props = cache.get("pdf_sha256", digest) if cache is not None else None
+        if props is None:
+            props = _run_pdf_analysis(path, pool)
+            if cache is not None:
+                cache.set("pdf_sha256", digest, props)
+    finally:
+        os.unlink(path)
+    if cache is not None and key is not None:
+        cache.set("pdf", key, props)
+    return props
+
+def _check_pdf_accessibility(files, accessibility_issues, default_location="", cache=None, pool=None,
+                             downloads=PDF_DOWNLOADS, workers=MAX_WORKERS):
+    """
+    Check each course PDF once and report its findings with every location
+    that links to it.  PDFs are streamed to temporary files, at most
+    ``downloads`` at a time on ``workers`` threads, and analysed in
+    ``pool`` (the parse process pool) or else the PDF_PROCESSES pool;
+    results are cached by file version and by content checksum.  Without
+    PyPDF2 every PDF is listed for manual review.
+    """
+    pdfs = list(files.by_mime_class.get('pdf', {}).values())
+    try:
+        if pdfs:
+            _import_pypdf()
+    except ImportError as exc:
+        print(f"⚠️  {exc}; listing PDFs for manual review.")
+        results = [{"error": "not checked (PyPDF2 is not installed)"}] * len(pdfs)
+    else:
+        http = _get_http()
+        gate = threading.BoundedSemaphore(downloads)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(downloads, workers)) as ex:
+            results = list(ex.map(lambda f: _pdf_properties(f, http, cache, pool, gate), pdfs))
+    for file_obj, props in zip(pdfs, results):
+        locations = files.references.get(str(file_obj.id)) or [default_location]
+        for issue_type, description, severity in _pdf_findings(props, file_obj.display_name):
+            _add_accessibility_issue(accessibility_issues, issue_type, description, ", ".join(locations), severity)
+
+class _MediaRule(_Rule):
     """Check for media accessibility issues"""
-    # Check for videos without captions
-    videos = soup.find_all('video')
-    for video in videos:
-        tracks = video.find_all('track', kind='captions')
-        if not tracks:
-            src = video.get('src', 'unknown')
-            _add_accessibility_issue(
-                accessibility_issues,
-                "Video Without Captions",
-                f"Video element missing captions: {src[:50]}...",
-                location,
-                "Error"
+    tags = ("video", "audio", "track")
+    end_tags = ("video",)
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.videos = []
+        self.audios = []
+        self.open = []
+
+    def start(self, el):
+        if el.name == "video":
+            video = [el.get('src', 'unknown'), False]
+            self.videos.append(video)
+            self.open.append(video)
+        elif el.name == "audio":
+            self.audios.append(el.get('src', 'unknown'))
+        elif el.get('kind') == 'captions':
+            for video in self.open:
+                video[1] = True
+
+    def end(self, el):
+        self.open.pop()
+
+    def finish(self):
+        # Check for videos without captions
+        for src, has_captions in self.videos:
+            if not has_captions:
+                self.issue(
+                    "Video Without Captions",
+                    f"Video element missing captions: {src[:50]}...",
+                    "Error"
+                )
+        
+        # Check for audio without transcripts
+        for src in self.audios:
+            self.issue(
+                "Audio Content",
+                f"Audio element requires transcript verification: {src[:50]}...",
+                "Needs Review"
             )
-    
-    # Check for audio without transcripts
-    audios = soup.find_all('audio')
-    for audio in audios:
-        src = audio.get('src', 'unknown')
-        _add_accessibility_issue(
-            accessibility_issues,
-            "Audio Content",
-            f"Audio element requires transcript verification: {src[:50]}...",
-            location,
-            "Needs Review"
-        )
+        super().finish()
 
-def _check_form_accessibility(soup, location, accessibility_issues):
+class _FormRule(_Rule):
     """Check for form accessibility issues"""
-    # Check for form inputs without labels
-    inputs = soup.find_all(['input', 'textarea', 'select'])
-    
-    for input_elem in inputs:
-        input_type = input_elem.get('type', 'text')
-        input_id = input_elem.get('id')
-        input_name = input_elem.get('name', 'unnamed')
-        
+    tags = ("input", "textarea", "select", "label")
+    end_tags = ("label",)
+
+    def __init__(self, doc):
+        super().__init__(doc)
+        self.inputs = []
+        self.label_for = set()
+        self.open_labels = 0
+
+    def start(self, el):
+        if el.name == "label":
+            self.open_labels += 1
+            if el.get('for') is not None:
+                self.label_for.add(el.get('for'))
+            return
+        input_type = el.get('type', 'text')
         # Skip hidden inputs and buttons
         if input_type in ['hidden', 'submit', 'button']:
-            continue
-        
-        # Check for associated label
-        label = None
-        if input_id:
-            label = soup.find('label', attrs={'for': input_id})
-        
-        if not label:
-            # Check if input is wrapped in a label
-            parent_label = input_elem.find_parent('label')
-            if not parent_label:
-                _add_accessibility_issue(
-                    accessibility_issues,
+            return
+        self.inputs.append((el.get('id'), el.get('name', 'unnamed'), self.open_labels > 0))
+
+    def end(self, el):
+        self.open_labels -= 1
+
+    def finish(self):
+        # Check for form inputs without labels, either associated or wrapping
+        for input_id, input_name, wrapped in self.inputs:
+            if not (input_id and input_id in self.label_for) and not wrapped:
+                self.issue(
                     "Form Input Without Label",
                     f"Form input missing associated label: {input_name}",
-                    location,
                     "Error"
                 )
+        super().finish()
 
-def _run_accessibility_checks(soup, course, location, accessibility_issues):
-    """Run all accessibility checks on the parsed HTML"""
-    _check_images_accessibility(soup, location, accessibility_issues)
-    _check_links_accessibility(soup, location, accessibility_issues)
-    _check_headings_accessibility(soup, location, accessibility_issues)
-    _check_color_accessibility(soup, location, accessibility_issues)
-    _check_tables_accessibility(soup, location, accessibility_issues)
-    _check_lists_accessibility(soup, location, accessibility_issues)
-    _check_media_accessibility(soup, location, accessibility_issues)
-    _check_form_accessibility(soup, location, accessibility_issues)
-    _check_pdf_accessibility(course, location, accessibility_issues)
-
-def _process_html_with_accessibility(soup, course, page, yt_links, media_links, link_media, lib_media, accessibility_issues):
-    """Enhanced HTML processing that includes accessibility checks"""
-    # Run original media processing
-    _process_html(soup, course, page, yt_links, media_links, link_media, lib_media)
-    
-    # Run accessibility checks
-    _run_accessibility_checks(soup, course, page, accessibility_issues)
+# Accessibility rules, in the order their findings are reported
+ACCESSIBILITY_RULES = [
+    _ImagesRule, _LinksRule, _HeadingsRule, _ColorRule,
+    _TablesRule, _ListsRule, _MediaRule, _FormRule,
+]
+
+def _run_rule(rule, soup, location, accessibility_issues):
+    _walk_rules(soup, [rule(_Document(location, accessibility_issues=accessibility_issues))])
+
+def _check_images_accessibility(soup, location, accessibility_issues):
+    _run_rule(_ImagesRule, soup, location, accessibility_issues)
+
+def _check_links_accessibility(soup, location, accessibility_issues):
+    _run_rule(_LinksRule, soup, location, accessibility_issues)
+
+def _check_headings_accessibility(soup, location, accessibility_issues):
+    _run_rule(_HeadingsRule, soup, location, accessibility_issues)
+
+def _check_color_accessibility(soup, location, accessibility_issues):
+    _run_rule(_ColorRule, soup, location, accessibility_issues)
+
+def _check_tables_accessibility(soup, location, accessibility_issues):
+    _run_rule(_TablesRule, soup, location, accessibility_issues)
+
+def _check_lists_accessibility(soup, location, accessibility_issues):
+    _run_rule(_ListsRule, soup, location, accessibility_issues)
+
+def _check_media_accessibility(soup, location, accessibility_issues):
+    _run_rule(_MediaRule, soup, location, accessibility_issues)
+
+def _check_form_accessibility(soup, location, accessibility_issues):
+    _run_rule(_FormRule, soup, location, accessibility_issues)
+
+def _run_accessibility_checks(soup, location, accessibility_issues):
+    """Run all accessibility checks on the parsed HTML in a single walk"""
+    doc = _Document(location, accessibility_issues=accessibility_issues)
+    _walk_rules(soup, [rule(doc) for rule in ACCESSIBILITY_RULES])
+
+def _process_html_with_accessibility(soup, files, page, yt_links, media_links, link_media, lib_media, accessibility_issues,
+                                     cache=None, media_checker=None):
+    """Media extraction and accessibility checks, sharing one walk of the tree"""
+    doc = _Document(page, files, cache, yt_links, media_links, link_media, lib_media, accessibility_issues,
+                    media_checker)
+    _walk_rules(soup, [rule(doc) for rule in MEDIA_RULES + ACCESSIBILITY_RULES])
 
 # ----------------------------------------------------------------------
-# MAIN FUNCTION
+# Incremental re-scan manifest
 # ----------------------------------------------------------------------
-def run_caption_report(course_input: str) -> str:
-    """Generate caption report and accessibility report, write to Google Sheet with multiple tabs."""
+class _CourseManifest:
+    """
+    Findings from the last scan of a course, one entry per content item
+    keyed by location and fingerprinted by Canvas ``updated_at`` plus a
+    hash of the body.  Items whose fingerprint is unchanged reuse their
+    saved findings instead of being parsed again.  A manifest saved with
+    another parser or library provider table is ignored, since either can
+    change the findings.
+
+    The manifest is a JSON-lines file: a header, then one line per item.
+    Only each saved item's fingerprint and file offset are kept in memory;
+    its findings are read back when it is reused.  Items seen in the
+    current run are written to the new manifest as they complete and
+    ``save`` puts it in place, so deleted content drops out; ``close``
+    without ``save`` (a failed run) keeps the old one.
+    """
 
-    # Authenticate Google Sheets for Colab
-    print("🔐 Authenticating with Google Sheets …")
-    from google.colab import auth
-    from google.auth import default
-    auth.authenticate_user()
-    creds, _ = default()
-    gc = gspread.authorize(creds)
+    def __init__(self, course_id, manifest_dir=MANIFEST_DIR, parser=HTML_PARSER, rescan=False):
+        self.path = os.path.join(manifest_dir, f"{course_id}.jsonl")
+        self.header = {"version": MANIFEST_VERSION, "parser": parser, "providers": _lib_media_digest()}
+        self.previous = {}  # location -> (fingerprint, offset of its line)
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._old = self._new = None
+        if not rescan and os.path.exists(self.path):
+            try:
+                self._old = open(self.path, "rb")
+                if json.loads(self._old.readline() or "null") == self.header:
+                    offset = self._old.tell()
+                    for line in self._old:
+                        entry = json.loads(line)
+                        self.previous[entry["location"]] = (entry["fingerprint"], offset)
+                        offset += len(line)
+            except (OSError, ValueError, KeyError, TypeError):
+                self.previous = {}  # unreadable manifest: fall back to a full scan
+            if not self.previous:
+                self.close()
+
+    @staticmethod
+    def fingerprint(body, updated_at):
+        digest = hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+        return [str(updated_at or ""), digest]
+
+    def lookup(self, location, fingerprint):
+        entry = self.previous.get(location)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        with self._lock:
+            self._old.seek(entry[1])
+            line = self._old.readline()
+            self._write(line)
+            self.reused += 1
+        return json.loads(line)["scan"]
+
+    def store(self, location, fingerprint, scan):
+        line = json.dumps({"location": location, "fingerprint": fingerprint, "scan": scan}).encode("utf-8")
+        with self._lock:
+            self._write(line + b"\n")
+
+    def _write(self, line):
+        if self._new is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._new = open(f"{self.path}.tmp", "wb")
+            self._new.write(json.dumps(self.header).encode("utf-8") + b"\n")
+        self._new.write(line)
+
+    def save(self):
+        with self._lock:
+            self._write(b"")
+            self._new.close()
+            self._new = None
+            os.replace(f"{self.path}.tmp", self.path)
+        self.close()
+
+    def close(self):
+        """Release the files; an unsaved new manifest is discarded"""
+        with self._lock:
+            if self._old is not None:
+                self._old.close()
+                self._old = None
+            if self._new is not None:
+                self._new.close()
+                self._new = None
+                os.remove(f"{self.path}.tmp")
 
-    # Get Canvas course
-    if "courses/" in course_input:
-        course_id = course_input.split("courses/")[-1].split("/")[0].split("?")[0]
-    else:
-        course_id = course_input.strip()
+# ----------------------------------------------------------------------
+# Concurrent content scanning
+# ----------------------------------------------------------------------
+SCAN_CONTAINERS = ("yt_links", "media_links", "link_media", "lib_media")
+# Per-item media containers and the findings-store section each feeds
+SCAN_MEDIA_SECTIONS = (("media_links", "media"), ("link_media", "linked_files"), ("lib_media", "library"))
+
+def _new_scan():
+    """Empty per-item result containers, plus deferred file and media-object references"""
+    scan = {name: {} for name in SCAN_CONTAINERS}
+    scan["accessibility_issues"] = []
+    scan["file_refs"] = []
+    scan["media_objects"] = []
+    return scan
+
+def _merge_scan(scan, files, findings, course_id, yt_links, media_refs):
+    """
+    Fold one item's media results into the findings store and the run's
+    YouTube and media-object references, as a serial scan would.
+    Accessibility findings are left to the caller, which streams them to
+    the report.
+    """
+    for url, location in scan["media_objects"]:
+        locations = media_refs.setdefault(url, [])
+        if location not in locations:
+            locations.append(location)
+    for key, pages in scan["yt_links"].items():
+        yt_links.setdefault(key, []).extend(pages)
+    for container, section in SCAN_MEDIA_SECTIONS:
+        for media, entry in scan[container].items():
+            findings.add_media(course_id, section, media, _MediaEntry(*entry))
+    for file_id, location in scan["file_refs"]:
+        files.add_reference(file_id, location)
+
+def _scan_sources(sources, handle, workers=MAX_WORKERS):
+    """
+    Producer/consumer scan of every content source at once.
+
+    ``sources`` is a list of (label, produce) where produce() yields
+    (kind, payload, location, updated_at) items.  One fetcher thread per
+    source paginates onto a bounded queue while ``workers`` parser threads
+    call handle(kind, payload, location, updated_at) for each item, so parsing overlaps
+    network waits.  Results are yielded in source/item order, i.e. the
+    order a serial scan would have produced them, each as soon as it and
+    everything before it is done; the first error in that order is
+    re-raised once the pipeline has drained.
+    """
+    q = queue.Queue(maxsize=SCAN_QUEUE_SIZE)
+    results, errors, counts = {}, {}, [0] * len(sources)
+    finished = [False] * len(sources)
+    ready = threading.Condition()
 
-    canvas = Canvas(CANVAS_API_URL, CANVAS_API_KEY)
-    course = canvas.get_course(course_id)
-    print(f"\n📘 Processing Canvas course: {course.name}\n")
+    def fetch(idx, produce):
+        try:
+            for item in produce():
+                q.put(((idx, counts[idx]), item))
+                counts[idx] += 1
+        except Exception as exc:
+            errors[(idx, counts[idx])] = exc
+        with ready:
+            finished[idx] = True
+            last = all(finished)
+            ready.notify_all()
+        if last:
+            for _ in range(workers):
+                q.put(None)
+
+    def parse():
+        while True:
+            task = q.get()
+            if task is None:
+                return
+            order, item = task
+            try:
+                result = handle(*item)
+            except Exception as exc:
+                errors[order] = exc
+            else:
+                results[order] = result
+            with ready:
+                ready.notify_all()
 
-    # Data containers
-    yt_links, media_links, link_media, lib_media = {}, {}, {}, {}
-    accessibility_issues = {}
+    ex = concurrent.futures.ThreadPoolExecutor(max_workers=len(sources) + workers)
+    try:
+        for _ in range(workers):
+            ex.submit(parse)
+        for i, (_, produce) in enumerate(sources):
+            ex.submit(fetch, i, produce)
+        first_error = None
+        for idx in range(len(sources)):
+            seq = 0
+            while True:
+                with ready:
+                    while ((idx, seq) not in results and (idx, seq) not in errors
+                           and not (finished[idx] and seq >= counts[idx])):
+                        ready.wait()
+                order = (idx, seq)
+                if order in errors:
+                    first_error = first_error or errors[order]
+                if order in results:
+                    if first_error is None:
+                        yield results.pop(order)
+                elif order not in errors:
+                    break           # source exhausted
+                seq += 1
+    finally:
+        ex.shutdown(wait=True)
+
+    for (label, _), count in zip(sources, counts):
+        print(f"   ✔️  {label}: {count} items")
+
+    if first_error is not None:
+        raise first_error
 
-    def _handle_with_accessibility(html, location):
-        if not html:
-            return
-        soup = BeautifulSoup(html.encode("utf-8"), "html.parser")
-        _process_html_with_accessibility(soup, course, location, yt_links, media_links, link_media, lib_media, accessibility_issues)
+# ----------------------------------------------------------------------
+# Parse worker processes (processes > 0)
+# ----------------------------------------------------------------------
+def _start_scan_pool(processes):
+    """Process pool for _scan_html_worker"""
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context(SCAN_MP_CONTEXT),
+        initializer=_init_scan_worker, initargs=(dict(LIB_MEDIA_PROVIDERS),))
+
+def _init_scan_worker(providers):
+    # Library providers may have been extended from the config file; hooks
+    # inherited through fork belong to the parent, which replays the events
+    _add_lib_media_providers(providers)
+    _trace_hooks.clear()
+    _import_bs4()
+
+class _DeferredFiles:
+    """Stand-in for the course file index in a worker: records linked file ids, resolves none"""
+
+    def __init__(self):
+        self.file_ids = []
+
+    def get_many(self, file_ids):
+        self.file_ids.extend(file_ids)
+        return {}
+
+def _scan_html_worker(html, location, parser):
+    """
+    Parse one HTML body and run the media and accessibility rules on it,
+    in a worker process.  Returns (scan, file_ids, events): the item's
+    findings except linked files, the Canvas file ids its links point at,
+    in link order, for the parent to resolve, and the trace events raised.
+    """
+    events = []
+    hook = add_trace_hook(lambda event, fields: events.append((event, fields)))
+    try:
+        scan = _new_scan()
+        files = _DeferredFiles()
+        soup = _parse_html(html, parser)
+        _process_html_with_accessibility(soup, files, location, scan["yt_links"], scan["media_links"],
+                                         scan["link_media"], scan["lib_media"], scan["accessibility_issues"],
+                                         None, _MediaRefRecorder(None, scan["media_objects"]))
+    finally:
+        remove_trace_hook(hook)
+    return scan, files.file_ids, events
+
+def _resolve_file_links(scan, files, file_ids, location):
+    """Add the audio/video files behind a worker's file links to its scan, as _AnchorMediaRule does"""
+    resolved = files.get_many(file_ids)
+    for file_id in file_ids:
+        f = resolved.get(str(file_id))
+        if f is not None:
+            scan["file_refs"].append((f.id, location))
+            _add_file_entry(scan["link_media"], f, location)
 
-    # --------------------------------------------------------------
-    # Scanning sections with printouts
-    # --------------------------------------------------------------
-    print("🔎 Scanning Pages …")
-    for p in course.get_pages():
-        _handle_with_accessibility(course.get_page(p.url).body, p.html_url)
+# ----------------------------------------------------------------------
+# Report output
+# ----------------------------------------------------------------------
+ACCESSIBILITY_COLUMNS = ["Issue Type", "Severity", "Description", "Location"]
+REPORT_TABS = (VAST_TAB, ACCESSIBILITY_TAB)
+OUTPUT_MODULES = {"sheets": "gspread", "parquet": "pyarrow.parquet", "xlsx": "openpyxl"}
 
-    print("🔎 Scanning Assignments …")
-    for a in course.get_assignments():
-        _handle_with_accessibility(a.description, a.html_url)
+def _import_output_module(output):
+    module = OUTPUT_MODULES[output]
+    try:
+        return importlib.import_module(module)
+    except ImportError as exc:
+        package = module.split(".")[0]
+        raise ImportError(f'output="{output}" needs {package}: `!pip install {package}`') from exc
 
-    print("🔎 Scanning Discussions …")
-    for d in course.get_discussion_topics():
-        _handle_with_accessibility(d.message, d.html_url)
+def _check_output(output):
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {', '.join(OUTPUTS)}")
+    if output in OUTPUT_MODULES:
+        _import_output_module(output)
 
-    print("🔎 Scanning Syllabus …")
-    try:
-        syllabus = canvas.get_course(course_id, include="syllabus_body")
-        _handle_with_accessibility(syllabus.syllabus_body, f"{CANVAS_API_URL}/courses/{course_id}/assignments/syllabus")
-    except Exception:
-        print("⚠️  Could not load syllabus.")
+def _table_filename(name, extension):
+    return re.sub(r"\W+", "_", name).strip("_").lower() + extension
+
+class _FileTableWriter:
+    """
+    Streams one table's rows into a spool file next to ``path``, with the
+    same append/flush/write_row/close interface as _SheetsWriter (row 1 is
+    the header).  ``close`` replays the spool through ``_dump``, applying
+    rows replaced with ``write_row``, and moves the result into place, so
+    memory stays flat and a crashed run never leaves a half-written report.
+    """
+    extension = ""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.next_row = 2
+        self._replaced = {}
+        self._spool = open(f"{path}.part", "w", encoding="utf-8")
+
+    def append(self, rows):
+        for row in rows:
+            self._spool.write(json.dumps(row) + "\n")
+        self.next_row += len(rows)
+
+    def flush(self):
+        self._spool.flush()
+
+    def write_row(self, row_number, row):
+        self._replaced[row_number] = list(row)
+
+    def _rows(self):
+        with open(self._spool.name, encoding="utf-8") as fh:
+            for row_number, line in enumerate(fh, start=2):
+                yield self._replaced.get(row_number) or json.loads(line)
+
+    def close(self):
+        self._spool.close()
+        tmp = f"{self.path}.tmp"
+        self._dump(tmp, self._rows())
+        os.replace(tmp, self.path)
+        os.remove(self._spool.name)
+
+    def abort(self):
+        """Drop the rows of a failed run, leaving the last report in place"""
+        if not self._spool.closed:
+            self._spool.close()
+            os.remove(self._spool.name)
+
+    def _dump(self, path, rows):
+        raise NotImplementedError
+
+class _CsvTableWriter(_FileTableWriter):
+    extension = ".csv"
+
+    def _dump(self, path, rows):
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            out = csv.writer(fh)
+            out.writerow(self.columns)
+            out.writerows(rows)
+
+class _JsonlTableWriter(_FileTableWriter):
+    """One JSON object per row, keyed by column name"""
+    extension = ".jsonl"
+
+    def _dump(self, path, rows):
+        with open(path, "w", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n")
+
+class _ParquetTableWriter(_FileTableWriter):
+    """Every column is a string, written in row groups of ROW_GROUP rows"""
+    extension = ".parquet"
+    ROW_GROUP = 10000
+
+    def _dump(self, path, rows):
+        pq = _import_output_module("parquet")
+        pa = importlib.import_module("pyarrow")
+        schema = pa.schema([(column, pa.string()) for column in self.columns])
+        with pq.ParquetWriter(path, schema) as out:
+            while True:
+                chunk = list(itertools.islice(rows, self.ROW_GROUP))
+                if not chunk:
+                    break
+                out.write_table(pa.table(
+                    [["" if row[i] is None else str(row[i]) for row in chunk] for i in range(len(self.columns))],
+                    schema=schema
+                ))
+
+class _XlsxTableWriter(_FileTableWriter):
+    """Fills one tab of the course workbook; _XlsxReport saves the workbook"""
+
+    def __init__(self, path, columns, ws):
+        super().__init__(path, columns)
+        self.ws = ws
+
+    def close(self):
+        self._spool.close()
+        self.ws.append(self.columns)
+        for row in self._rows():
+            self.ws.append(row)
+        os.remove(self._spool.name)
+
+FILE_WRITERS = {"csv": _CsvTableWriter, "jsonl": _JsonlTableWriter, "parquet": _ParquetTableWriter}
+
+class _Report:
+    """
+    A course report, one table per tab.  ``close`` publishes it once every
+    table is closed; ``abort`` drops a failed run's tables instead.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.tables = []
+
+    def table(self, name, columns):
+        table = self._table(name, columns)
+        self.tables.append(table)
+        return table
+
+    def _table(self, name, columns):
+        raise NotImplementedError
+
+    def close(self):
         pass
 
-    print("🔎 Scanning Modules …")
-    for mod in course.get_modules():
-        for item in mod.get_module_items(include="content_details"):
-            mod_url = f"{CANVAS_API_URL}/courses/{course_id}/modules/items/{item.id}"
-            if item.type == "ExternalUrl":
-                href = item.external_url
-                if re.search(YT_PATTERN, href):
-                    yt_links.setdefault(href, []).append(mod_url)
-                if any(u in href for u in LIB_MEDIA_URLS):
-                    _add_entry(lib_media, href, "Manually Check for Captions", mod_url)
-            if item.type == "File":
-                try:
-                    f = course.get_file(item.content_id)
-                    f_url = f.url.split("?")[0]
-                    name = f.display_name
-                    if "audio" in f.mime_class:
-                        _add_entry(link_media, f"Linked Audio File: {name}", "Manually Check for Captions", mod_url, file_location=f_url)
-                    if "video" in f.mime_class:
-                        _add_entry(link_media, f"Linked Video File: {name}", "Manually Check for Captions", mod_url, file_location=f_url)
-                except Exception:
-                    pass
-
-    print("🔎 Scanning Announcements …")
-    for ann in course.get_discussion_topics(only_announcements=True):
-        _handle_with_accessibility(ann.message, ann.html_url)
-
-    # --------------------------------------------------------------
-    # YouTube processing
-    # --------------------------------------------------------------
-    print("\n▶️  Checking YouTube captions …")
-    yt_tasks, yt_processed = [], {}
-    for key, pages in yt_links.items():
-        if "list" in key:
-            yt_processed[key] = ["this is a playlist, check individual videos", "", "", ""] + pages
-            continue
-        vid_match = re.findall(YT_PATTERN, key, re.IGNORECASE)
-        video_id = vid_match[0] if vid_match else None
-        if video_id:
-            yt_tasks.append((key, video_id, pages, YOUTUBE_API_KEY))
-        else:
-            yt_processed[key] = ["Unable to parse Video ID", "", "", ""] + pages
+    def abort(self):
+        for table in self.tables:
+            table.abort()
 
-    if yt_tasks:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as ex:
-            for k, st, (h, m, s), pg in ex.map(_check_youtube, yt_tasks):
-                yt_processed[k] = [st, h, m, s] + pg
-    yt_links = yt_processed
+class _FileReport(_Report):
+    """Local report: one file per tab in ``directory``"""
 
-    # --------------------------------------------------------------
-    # Compile VAST results
-    # --------------------------------------------------------------
-    print("\n📊 Compiling VAST results …")
+    def __init__(self, directory, writer_cls):
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(directory)
+        self.writer_cls = writer_cls
 
-    # Check if there are any linked audio/video files
-    has_linked_files = len(link_media) > 0
+    def _table(self, name, columns):
+        path = os.path.join(self.location, _table_filename(name, self.writer_cls.extension))
+        return self.writer_cls(path, columns)
 
-    rows = []
-    total_minutes = 0  # Track total duration
-    
-    for container in (yt_links, media_links, link_media, lib_media):
-        for key, vals in container.items():
-            # Extract time components (if they exist)
-            if len(vals) >= 4:
-                status, hour, minute, second = vals[0], vals[1], vals[2], vals[3]
-                location = vals[4] if len(vals) > 4 else ""
-                file_location = vals[5] if len(vals) > 5 else ""
-                
-                # Consolidate time and get minutes for totaling
-                duration, minutes_to_add = _consolidate_time(hour, minute, second)
-                total_minutes += minutes_to_add
-                
-                # Build row based on whether we have file locations
-                if has_linked_files:
-                    rows.append([key, status, duration, location, file_location])
-                else:
-                    rows.append([key, status, duration, location])
-            else:
-                # Fallback for entries without time data
-                if has_linked_files:
-                    rows.append([key] + vals + [""] * (5 - len(vals)))
-                else:
-                    rows.append([key] + vals + [""] * (4 - len(vals)))
+class _XlsxReport(_Report):
+    """Local report: one workbook at ``path`` with a sheet per tab"""
 
-    # Add total row
-    total_duration = _minutes_to_duration(total_minutes)
-    if has_linked_files:
-        total_row = ["Total Duration", "", total_duration, "", ""]
-    else:
-        total_row = ["Total Duration", "", total_duration, ""]
-    
-    rows.append(total_row)
+    def __init__(self, path, tabs=REPORT_TABS):
+        openpyxl = _import_output_module("xlsx")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__(path)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self._tabs = {name: self.workbook.create_sheet(title=name) for name in tabs}
 
-    # Define columns based on whether there are linked files
-    if has_linked_files:
-        columns = [
-            "Media", "Caption Status", "Duration (HH:MM)", "Location", "File Location"
-        ]
-    else:
-        columns = [
-            "Media", "Caption Status", "Duration (HH:MM)", "Location"
-        ]
+    def _table(self, name, columns):
+        return _XlsxTableWriter(f"{self.location}.{_table_filename(name, '')}", columns, self._tabs[name])
 
-    vast_df = pd.DataFrame(rows, columns=columns)
+    def close(self):
+        tmp = f"{self.location}.tmp"
+        self.workbook.save(tmp)
+        os.replace(tmp, self.location)
 
-    # --------------------------------------------------------------
-    # Compile Accessibility results
-    # --------------------------------------------------------------
-    print("\n♿ Compiling Accessibility results …")
-    
-    accessibility_rows = []
-    error_count = 0
-    suggestion_count = 0
-    review_count = 0
-    
-    for issue_key, occurrences in accessibility_issues.items():
-        for occurrence in occurrences:
-            severity = occurrence['severity']
-            location = occurrence['location']
-            description = occurrence['description']
-            
-            accessibility_rows.append([
-                issue_key,
-                severity,
-                description,
-                location
-            ])
-            
-            # Count by severity
-            if severity == "Error":
-                error_count += 1
-            elif severity == "Suggestion":
-                suggestion_count += 1
-            elif severity == "Needs Review":
-                review_count += 1
-
-    # Add summary row
-    summary_row = [
-        "SUMMARY",
-        f"Errors: {error_count}, Suggestions: {suggestion_count}, Needs Review: {review_count}",
-        f"Total Issues: {len(accessibility_rows)}",
-        ""
-    ]
-    accessibility_rows.insert(0, summary_row)
-
-    accessibility_df = pd.DataFrame(accessibility_rows, columns=[
-        "Issue Type", "Severity", "Description", "Location"
-    ])
-
-    # --------------------------------------------------------------
-    # Create or replace Google Sheet with multiple tabs (NO SHARING)
-    # --------------------------------------------------------------
-    print("\n📄 Creating or updating Google Sheet …")
-    sheet_title = f"{course.name} VAST Report"
+# ----------------------------------------------------------------------
+# Google Sheets output (output="sheets")
+# ----------------------------------------------------------------------
+SHEETS_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
 
-    try:
-        existing_sheets = gc.list_spreadsheet_files()
-        sheet = next((s for s in existing_sheets if s["name"] == sheet_title), None)
-    except Exception:
-        sheet = None
+_sheets_lock = threading.Lock()
+_sheets_next_call = 0.0
 
-    if sheet:
+def _sheets_call(fn, *args, **kwargs):
+    """
+    Call a gspread write method, spaced SHEETS_MIN_INTERVAL apart across
+    every thread (the write quota is per user) and retried with backoff
+    when Sheets answers 429 or 5xx.
+    """
+    global _sheets_next_call
+    gspread = _import_output_module("sheets")
+    attempt = 0
+    while True:
+        with _sheets_lock:
+            wait = _sheets_next_call - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            _sheets_next_call = time.monotonic() + SHEETS_MIN_INTERVAL
+        try:
+            return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as exc:
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+            if status not in _HttpSession.RETRY_STATUSES or attempt >= HTTP_MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(SHEETS_MIN_INTERVAL, attempt))
+            attempt += 1
+
+def _sheets_literal(value):
+    """A cell value that USER_ENTERED input keeps as text if it would parse as a formula"""
+    if isinstance(value, str) and value.startswith(SHEETS_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+class _SheetsWriter:
+    """
+    Streams rows into one worksheet, header first.  Rows are buffered and
+    written SHEETS_CHUNK_ROWS at a time, or sooner once SHEETS_FLUSH_SECONDS
+    have passed so partial results show up during a long scan.  The sheet
+    grows ahead of the writes and ``close`` trims it to exactly the rows
+    and columns written.  Values are written as if typed, so durations
+    become numbers, but text starting with "=", "+", "-" or "@" (a page
+    title or link text) is quoted so it stays text rather than a formula.
+    """
+
+    def __init__(self, ws, columns, chunk_rows=SHEETS_CHUNK_ROWS, flush_seconds=SHEETS_FLUSH_SECONDS):
+        self.ws = ws
+        self.width = len(columns)
+        self.chunk_rows = chunk_rows
+        self.flush_seconds = flush_seconds
+        self.next_row = 1
+        self._buffer = [list(columns)]
+        self._flushed_at = time.monotonic()
+
+    def append(self, rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.chunk_rows or time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        buffer, self._buffer = self._buffer, []
+        for i in range(0, len(buffer), self.chunk_rows):
+            chunk = buffer[i:i + self.chunk_rows]
+            self._write(self.next_row, chunk)
+            self.next_row += len(chunk)
+        self._flushed_at = time.monotonic()
+
+    def write_row(self, row_number, row):
+        """Overwrite a row that was already written, e.g. a summary at the top"""
+        self._write(row_number, [row])
+
+    def _write(self, first_row, rows):
+        last_row = first_row + len(rows) - 1
+        if last_row > self.ws.row_count:
+            # Grow geometrically so a long stream needs few resize calls
+            _sheets_call(self.ws.add_rows, max(last_row - self.ws.row_count, self.ws.row_count))
+        if self.width > self.ws.col_count:
+            _sheets_call(self.ws.add_cols, self.width - self.ws.col_count)
+        rows = [[_sheets_literal(value) for value in row] for row in rows]
+        _sheets_call(self.ws.update, values=rows, range_name=f"A{first_row}",
+                     value_input_option="USER_ENTERED")
+
+    def close(self):
+        self.flush()
+        _sheets_call(self.ws.resize, rows=self.next_row - 1, cols=self.width)
+
+    def abort(self):
+        self._buffer = []
+
+def _find_report_sheet(gc, sheet_title, sheet_key=None):
+    """
+    Open the report by its stored spreadsheet id, falling back to a Drive
+    query for its title (reports made before ids were stored); None if
+    neither finds it.
+    """
+    gspread = _import_output_module("sheets")
+    if sheet_key:
+        try:
+            return gc.open_by_key(sheet_key)
+        except gspread.exceptions.SpreadsheetNotFound:
+            pass  # deleted, or no longer shared with us
+    try:
+        return gc.open(sheet_title)
+    except gspread.exceptions.SpreadsheetNotFound:
+        return None
+
+def _open_report_sheet(gc, sheet_title, sheet_key=None):
+    """Open the report, or create it; its tabs are left as they are until the new report is published"""
+    sh = _find_report_sheet(gc, sheet_title, sheet_key)
+    if sh:
         print(f"♻️  Found existing sheet: {sheet_title}. Updating contents …")
-        sh = gc.open_by_key(sheet["id"])
-        
-        # Ensure we have the worksheets we need
-        worksheet_names = [ws.title for ws in sh.worksheets()]
-        
-        # Get or create VAST Report worksheet
-        if "VAST Report" in worksheet_names:
-            vast_ws = sh.worksheet("VAST Report")
-            vast_ws.clear()
-        else:
-            # If no VAST Report exists, check if we can rename sheet1
-            if len(worksheet_names) == 1 and worksheet_names[0] == "Sheet1":
-                vast_ws = sh.sheet1
-                vast_ws.update_title("VAST Report")
-                vast_ws.clear()
+    else:
+        print(f"🆕 No existing sheet found. Creating new sheet: {sheet_title}")
+        sh = gc.create(sheet_title)
+    return sh
+
+class _SheetIndex:
+    """
+    Spreadsheet ids of earlier reports keyed by course id, kept as JSON at
+    ``path`` so each course's sheet is opened directly by id.
+    """
+
+    def __init__(self, path=SHEETS_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as fh:
+                    self._ids = json.load(fh)
+            except (OSError, ValueError):
+                pass  # unreadable index: sheets are found by title instead
+
+    def get(self, course_id):
+        with self._lock:
+            return self._ids.get(str(course_id))
+
+    def set(self, course_id, sheet_key):
+        with self._lock:
+            if self._ids.get(str(course_id)) == sheet_key:
+                return
+            self._ids[str(course_id)] = sheet_key
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as fh:
+                json.dump(self._ids, fh, indent=1)
+            os.replace(tmp, self.path)
+
+class _SheetsReport(_Report):
+    """
+    Google Sheet report: one worksheet per tab, written by _SheetsWriter.
+    Rows go to staging worksheets ("VAST Report (updating)" and so on)
+    and ``close`` swaps them in for the old tabs, so readers see the last
+    complete report until the new one is done, and a failed or
+    interrupted scan leaves it in place.
+    """
+
+    STAGING_SUFFIX = " (updating)"
+
+    def __init__(self, gc, course_id, sheet_title, index, tabs=REPORT_TABS):
+        self.sheet = _open_report_sheet(gc, sheet_title, index.get(course_id))
+        index.set(course_id, self.sheet.id)
+        super().__init__(self.sheet.url)
+        existing = {ws.title: ws for ws in self.sheet.worksheets()}
+        self._tabs = {}
+        for name in tabs:
+            # A staging tab left by an interrupted run is reused
+            ws = existing.get(name + self.STAGING_SUFFIX)
+            if ws is not None:
+                _sheets_call(ws.clear)
             else:
-                # Add new VAST Report worksheet
-                vast_ws = sh.add_worksheet(title="VAST Report", rows=1000, cols=10)
-        
-        # Get or create Accessibility Issues worksheet
-        if "Accessibility Issues" in worksheet_names:
-            accessibility_ws = sh.worksheet("Accessibility Issues")
-            accessibility_ws.clear()
-        else:
-            accessibility_ws = sh.add_worksheet(title="Accessibility Issues", rows=1000, cols=10)
-        
-        # Clean up any unwanted worksheets (but keep at least our two)
-        current_worksheets = sh.worksheets()
-        for ws in current_worksheets:
-            if ws.title not in ["VAST Report", "Accessibility Issues"] and len(current_worksheets) > 2:
+                ws = _sheets_call(self.sheet.add_worksheet, title=name + self.STAGING_SUFFIX, rows=1, cols=1)
+            self._tabs[name] = ws
+
+    def _table(self, name, columns):
+        return _SheetsWriter(self._tabs[name], columns)
+
+    def close(self):
+        # Drop the old tabs (and any others, e.g. a new sheet's Sheet1), then
+        # rename the staging tabs, which keeps them in REPORT_TABS order
+        staging = {ws.id for ws in self._tabs.values()}
+        for ws in self.sheet.worksheets():
+            if ws.id not in staging:
                 try:
-                    sh.del_worksheet(ws)
-                    current_worksheets.remove(ws)  # Update our list
+                    _sheets_call(self.sheet.del_worksheet, ws)
                 except Exception as e:
                     print(f"⚠️  Could not delete worksheet '{ws.title}': {e}")
-                
+        for name, ws in self._tabs.items():
+            _sheets_call(ws.update_title, name)
+
+    def abort(self):
+        super().abort()
+        for ws in self._tabs.values():
+            if not ws.title.endswith(self.STAGING_SUFFIX):
+                continue  # already published
+            try:
+                _sheets_call(self.sheet.del_worksheet, ws)
+            except Exception as e:
+                print(f"⚠️  Could not delete worksheet '{ws.title}': {e}")
+
+def _sheets_client():
+    """Authorize gspread: Colab user auth in a notebook, application default credentials elsewhere"""
+    gspread = _import_output_module("sheets")
+    from google.auth import default
+    print("🔐 Authenticating with Google Sheets …")
+    try:
+        from google.colab import auth
+    except ImportError:
+        # e.g. a service account named by GOOGLE_APPLICATION_CREDENTIALS
+        creds, _ = default(scopes=SHEETS_SCOPES)
     else:
-        print(f"🆕 No existing sheet found. Creating new sheet: {sheet_title}")
-        sh = gc.create(sheet_title)
-        vast_ws = sh.sheet1
-        vast_ws.update_title("VAST Report")
-        
-        # Create accessibility worksheet
-        accessibility_ws = sh.add_worksheet(title="Accessibility Issues", rows=1000, cols=10)
+        auth.authenticate_user()
+        creds, _ = default()
+    return gspread.authorize(creds)
+
+def _open_report(output, course_id, course_name, gc=None, output_dir=OUTPUT_DIR, sheet_index=None):
+    """Open the course's report for ``output``; local reports go in ``output_dir``"""
+    if output == "sheets":
+        return _SheetsReport(gc, course_id, f"{course_name} VAST Report", sheet_index or _SheetIndex())
+    if output == "xlsx":
+        return _XlsxReport(os.path.join(output_dir, f"{course_id}.xlsx"))
+    return _FileReport(os.path.join(output_dir, str(course_id)), FILE_WRITERS[output])
+
+# ----------------------------------------------------------------------
+# Metrics and tracing
+# ----------------------------------------------------------------------
+# Instrumented code reports what it does with _trace(event, **fields).
+# Every event goes to the process-wide _metrics and then to each hook
+# added with add_trace_hook, called as hook(event, fields):
+#
+#   stage_start  course_id, stage        a course enters a REPORT_STAGES stage
+#   stage        course_id, stage, seconds        ... and has finished it
+#   course       course_id, stages, error  report complete (error None) or
+#                                        failed; stages: {stage: seconds}
+#   request      method, url, status, seconds, bytes   one HTTP attempt
+#                                        (status None on connection errors)
+#   cache        kind, hit               one _ResultCache lookup
+#   parse        parser, bytes, seconds  one HTML body parsed
+#   walk         location, elements, strings, rules    one _walk_rules pass;
+#                                        rules: [(rule, dispatches, findings)]
+#
+# Hooks run on whichever thread produced the event (including the async
+# engine's event loop), so they must be quick and thread-safe.
+REPORT_STAGES = ("setup", "index_files", "scan", "media_objects", "pdfs", "youtube", "write")
+_trace_hooks = []
+
+def add_trace_hook(hook):
+    """Call ``hook(event, fields)`` for every trace event; returns ``hook``"""
+    _trace_hooks.append(hook)
+    return hook
+
+def remove_trace_hook(hook):
+    if hook in _trace_hooks:
+        _trace_hooks.remove(hook)
+
+def _trace(event, **fields):
+    _metrics(event, fields)
+    for hook in _trace_hooks:
+        hook(event, fields)
+
+# Canvas/Media path segments that are ids ("v1" is not), folded out of endpoint labels
+ENDPOINT_ID_RE = re.compile(r"^(?!v\d+$).*\d")
+
+@functools.lru_cache(maxsize=4096)
+def _endpoint(url):
+    """Label for a request URL with ids folded away, e.g. host/api/v1/courses/:id/pages"""
+    parts = urlsplit(url)
+    path = "/".join(":id" if ENDPOINT_ID_RE.match(seg) else seg for seg in parts.path.split("/"))
+    return parts.netloc + path
+
+class _Metrics:
+    """
+    Cumulative counters behind the trace events, kept for the life of the
+    process like Prometheus counters (a batch run adds up every course).
+    ``snapshot()`` returns them as plain data, ``prometheus()`` in the
+    Prometheus text format; ``snapshot(since=mark())`` counts only what
+    happened after the mark.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.stages = collections.defaultdict(lambda: [0, 0.0])          # stage -> runs, seconds
+        self.requests = collections.Counter()                           # (endpoint, status) -> count
+        self.latency = {}                                               # endpoint -> [buckets..., +Inf, sum]
+        self.cache = collections.Counter()                              # (kind, hit) -> count
+        self.parses = collections.defaultdict(lambda: [0, 0, 0.0])      # parser -> count, bytes, seconds
+        self.rules = collections.defaultdict(lambda: [0, 0, 0])         # rule -> documents, dispatches, findings
+
+    def __call__(self, event, fields):
+        with self._lock:
+            if event == "request":
+                endpoint = _endpoint(fields["url"])
+                self.requests[endpoint, fields["status"]] += 1
+                counts = self.latency.get(endpoint)
+                if counts is None:
+                    counts = self.latency[endpoint] = [0] * (len(self.buckets) + 1) + [0.0]
+                counts[bisect.bisect_left(self.buckets, fields["seconds"])] += 1
+                counts[-1] += fields["seconds"]
+            elif event == "cache":
+                self.cache[fields["kind"], fields["hit"]] += 1
+            elif event == "parse":
+                totals = self.parses[fields["parser"]]
+                totals[0] += 1
+                totals[1] += fields["bytes"]
+                totals[2] += fields["seconds"]
+            elif event == "walk":
+                for rule, dispatches, findings in fields["rules"]:
+                    totals = self.rules[rule]
+                    totals[0] += 1
+                    totals[1] += dispatches
+                    totals[2] += findings
+            elif event == "stage":
+                totals = self.stages[fields["stage"]]
+                totals[0] += 1
+                totals[1] += fields["seconds"]
+
+    def mark(self):
+        """Copy of every counter, for ``snapshot(since=...)``"""
+        with self._lock:
+            return (
+                {s: list(v) for s, v in self.stages.items()},
+                dict(self.requests),
+                {e: list(v) for e, v in self.latency.items()},
+                dict(self.cache),
+                {p: list(v) for p, v in self.parses.items()},
+                {r: list(v) for r, v in self.rules.items()},
+            )
+
+    def snapshot(self, since=None):
+        state = self.mark()
+        if since is not None:
+            state = tuple(_counts_since(now, before) for now, before in zip(state, since))
+        stages, request_counts, latency, cache_counts, parses, rules = state
+        requests = {}
+        for (endpoint, status), count in sorted(request_counts.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+            entry = requests.setdefault(endpoint, {"count": 0, "by_status": {}})
+            entry["count"] += count
+            entry["by_status"][str(status)] = count
+        for endpoint, entry in requests.items():
+            counts = latency[endpoint]
+            entry["seconds"] = round(counts[-1], 6)
+            entry["latency_buckets"] = dict(zip([str(b) for b in self.buckets] + ["+Inf"],
+                                                itertools.accumulate(counts[:-1])))
+        cache = {}
+        for (kind, hit), count in cache_counts.items():
+            entry = cache.setdefault(kind, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += count
+        for entry in cache.values():
+            entry["hit_rate"] = round(entry["hits"] / (entry["hits"] + entry["misses"]), 4)
+        return {
+            "stages": {s: {"runs": n, "seconds": round(t, 6)} for s, (n, t) in stages.items()},
+            "requests": requests,
+            "cache": cache,
+            "parse": {p: {"documents": n, "bytes": b, "seconds": round(t, 6)}
+                      for p, (n, b, t) in parses.items()},
+            "rules": {r: {"documents": d, "dispatches": n, "findings": f}
+                      for r, (d, n, f) in rules.items()},
+        }
+
+    def prometheus(self):
+        snap = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            # samples: (suffix, labels, value); histograms use the _bucket/_sum/_count suffixes
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{_prom_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {value}")
+
+        metric("vast_stage_seconds_total", "counter", "Wall time spent in each report stage",
+               [("", (("stage", s),), v["seconds"]) for s, v in snap["stages"].items()])
+        metric("vast_stage_runs_total", "counter", "Report stages completed",
+               [("", (("stage", s),), v["runs"]) for s, v in snap["stages"].items()])
+        metric("vast_http_requests_total", "counter", "HTTP attempts by endpoint and status",
+               [("", (("endpoint", e), ("status", st)), n)
+                for e, v in snap["requests"].items() for st, n in v["by_status"].items()])
+        histogram = []
+        for e, v in snap["requests"].items():
+            histogram.extend(("_bucket", (("endpoint", e), ("le", le)), n) for le, n in v["latency_buckets"].items())
+            histogram.append(("_sum", (("endpoint", e),), v["seconds"]))
+            histogram.append(("_count", (("endpoint", e),), v["count"]))
+        metric("vast_http_request_duration_seconds", "histogram", "HTTP attempt latency by endpoint", histogram)
+        metric("vast_cache_lookups_total", "counter", "Result cache lookups by kind and result",
+               [("", (("kind", k), ("result", r)), v[r]) for k, v in snap["cache"].items() for r in ("hits", "misses")])
+        metric("vast_parse_documents_total", "counter", "HTML bodies parsed",
+               [("", (("parser", p),), v["documents"]) for p, v in snap["parse"].items()])
+        metric("vast_parse_seconds_total", "counter", "Time spent parsing HTML",
+               [("", (("parser", p),), v["seconds"]) for p, v in snap["parse"].items()])
+        metric("vast_rule_documents_total", "counter", "Documents each rule checked",
+               [("", (("rule", r),), v["documents"]) for r, v in snap["rules"].items()])
+        metric("vast_rule_dispatches_total", "counter", "Nodes handed to each rule",
+               [("", (("rule", r),), v["dispatches"]) for r, v in snap["rules"].items()])
+        metric("vast_rule_findings_total", "counter", "Results produced by each rule",
+               [("", (("rule", r),), v["findings"]) for r, v in snap["rules"].items()])
+        return "\n".join(lines) + "\n"
+
+def _counts_since(now, before):
+    """Entries of one _Metrics.mark() table that changed since ``before``, as differences"""
+    changed = {}
+    for key, value in now.items():
+        old = before.get(key)
+        if old is None:
+            changed[key] = value
+        elif isinstance(value, list):
+            diff = [a - b for a, b in zip(value, old)]
+            if any(diff):
+                changed[key] = diff
+        elif value != old:
+            changed[key] = value - old
+    return changed
+
+def _prom_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_metrics = _Metrics()
+
+def _write_prometheus(path):
+    """Rewrite ``path`` with the current metrics, atomically, for a textfile collector"""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as fh:
+        fh.write(_metrics.prometheus())
+    os.replace(tmp, path)
+
+class _JsonLog:
+    """
+    Trace hook appending stage and course events to ``path`` as JSON
+    lines; each course event carries a metrics snapshot of what was
+    counted while that course ran.  Courses a batch runs at once share
+    the process, so each one's snapshot includes the others' work over
+    the same time.
+    """
+
+    EVENTS = ("stage", "course")
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = {}  # course_id -> _metrics.mark() when its report started
+
+    def __call__(self, event, fields):
+        if event == "stage_start" and fields["stage"] == REPORT_STAGES[0]:
+            self._marks[fields["course_id"]] = _metrics.mark()
+        if event not in self.EVENTS:
+            return
+        record = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "event": event, **fields}
+        if event == "course":
+            record["metrics"] = _metrics.snapshot(since=self._marks.pop(fields["course_id"], None))
+        with self._lock, open(self.path, "a") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+# course_id -> [current stage, entered at, {stage: seconds}]
+_stage_clocks = {}
+
+def _enter_stage(course_id, stage, error=None):
+    """
+    Move ``course_id`` into ``stage`` (None once its report is complete or
+    has failed with ``error``), timing the stage it leaves.  Returns
+    {stage: seconds} so far.
+    """
+    now = time.perf_counter()
+    clock = _stage_clocks.get(course_id)
+    if clock is None or stage == REPORT_STAGES[0]:
+        clock = _stage_clocks[course_id] = [None, now, {}]
+    if clock[0] is not None:
+        seconds = now - clock[1]
+        clock[2][clock[0]] = clock[2].get(clock[0], 0.0) + seconds
+        _trace("stage", course_id=course_id, stage=clock[0], seconds=seconds)
+    clock[0], clock[1] = stage, now
+    if stage is None:
+        del _stage_clocks[course_id]
+        _trace("course", course_id=course_id, stages=clock[2], error=error)
+    else:
+        _trace("stage_start", course_id=course_id, stage=stage)
+    return clock[2]
+
+# ----------------------------------------------------------------------
+# MAIN FUNCTION
+# ----------------------------------------------------------------------
+def _parse_course_id(course_input) -> str:
+    course_input = str(course_input)
+    if "courses/" in course_input:
+        return course_input.split("courses/")[-1].split("/")[0].split("?")[0]
+    return course_input.strip()
+
+def run_caption_report(course_input: str, refresh_cache: bool = False, cache_path: str = CACHE_PATH,
+                       canvas=None, gc=None, cache=None, parser: str = HTML_PARSER,
+                       manifest_dir: str = MANIFEST_DIR, full_rescan: bool = False,
+                       engine: str = "threads", aio=None, output: str = OUTPUT,
+                       output_dir: str = OUTPUT_DIR, sheet_index=None, findings=None,
+                       metrics_log: str = METRICS_LOG, metrics_prom: str = METRICS_PROM,
+                       processes: int = SCAN_PROCESSES, scan_pool=None) -> str:
+    """
+    Generate caption report and accessibility report and write both tabs to
+    ``output``: "sheets" (a Google Sheet, found again by the id stored in
+    SHEETS_INDEX_PATH), or "xlsx", "csv", "jsonl" or "parquet" files in
+    ``output_dir``.  Returns the sheet URL or the local report path.
+
+    YouTube and media-object caption results are cached in ``cache_path``
+    (set it to None to disable the cache); pass ``refresh_cache=True`` to
+    re-check every video and overwrite the cached results.
+
+    Pages, assignments, discussions, announcements and the syllabus whose
+    ``updated_at`` and body are unchanged since the last run reuse the
+    findings saved in ``manifest_dir`` (None disables this).  Pass
+    ``full_rescan=True`` (implied by ``refresh_cache``) to parse everything.
+
+    ``parser`` selects the HTML backend: "html.parser" (default), "lxml"
+    or "html5lib".
+
+    ``engine="async"`` (needs aiohttp) fetches Canvas content, media
+    objects, file metadata and YouTube captions on an asyncio event loop
+    instead of thread pools; HTML is still parsed on worker threads.
+
+    ``processes=N`` parses and checks HTML in N worker processes, using N
+    cores; linked Canvas files are still resolved in this process.
+
+    ``canvas``, ``gc``, ``cache``, ``aio``, ``sheet_index`` and
+    ``scan_pool`` let a caller (see run_batch_report) share one Canvas
+    client, Sheets client, result cache, async engine, sheet id index and
+    parse process pool across courses.  Every finding
+    is also recorded, under the course id, in ``findings`` (a
+    _FindingStore) when one is passed.
+
+    Stage timings and request, cache, parse and rule counts are appended
+    to ``metrics_log`` as JSON lines and written to ``metrics_prom`` as a
+    Prometheus text file (either may be None); add_trace_hook adds your
+    own tracing.
+    """
+
+    _configure()
+    _check_parser(parser)
+    _check_engine(engine)
+    _check_output(output)
+    if gc is None and output == "sheets":
+        gc = _sheets_client()
+
+    # Get Canvas course
+    course_id = _parse_course_id(course_input)
+    log = add_trace_hook(_JsonLog(metrics_log)) if metrics_log else None
+    own_aio = own_cache = False
+    report = manifest = None
+    try:
+        _enter_stage(course_id, "setup")
+
+        http = _get_http(MAX_WORKERS)
+        own_aio = engine == "async" and aio is None
+        if own_aio:
+            aio = _AsyncHttp()
+        # The session (and a batch's event loop) outlive this run
+        counted = aio if engine == "async" else http
+        counters_at_start = counted.counters()
+        if engine == "async":
+            canvas = _AsyncCanvas(aio)
+        elif canvas is None:
+            canvas = _make_canvas(http)
+        course = canvas.get_course(course_id)
+        print(f"\n📘 Processing Canvas course: {course.name}\n")
+
+        # --------------------------------------------------------------
+        # Create or replace the report (a Google Sheet is NOT shared)
+        # --------------------------------------------------------------
+        print("📄 Creating or updating Google Sheet …" if output == "sheets" else f"📄 Writing {output} report …")
+        report = _open_report(output, course_id, course.name, gc, output_dir, sheet_index)
+
+        # Accessibility findings are written to the report while the scan runs;
+        # the summary row is filled in once every finding is counted.
+        issues_out = report.table(ACCESSIBILITY_TAB, ACCESSIBILITY_COLUMNS)
+        issues_out.append([["SUMMARY", "Scan in progress …", "", ""]])
+        issues_out.flush()
+        if findings is None:
+            findings = _FindingStore()
+
+        def _report_issues(issues):
+            # Occurrences of the same issue are listed together, in the order
+            # each issue was first found
+            grouped = {}
+            for issue in issues:
+                issue = _Issue(*issue)
+                grouped.setdefault((issue.issue_type, issue.description), []).append(issue)
+            rows = []
+            for group in grouped.values():
+                for issue in group:
+                    findings.add_issue(course_id, issue)
+                    rows.append([f"{issue.issue_type}: {issue.description}", issue.severity,
+                                 issue.description, issue.location])
+            issues_out.append(rows)
+
+        # YouTube links and their locations, looked up after the scan
+        yt_links = {}
+
+        own_cache = cache is None and bool(cache_path)
+        if own_cache:
+            cache = _ResultCache(cache_path, refresh=refresh_cache)
+
+        _enter_stage(course_id, "index_files")
+        print("🗂️  Indexing course files and media objects …")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
+            listing = ex.submit(_MediaObjectIndex, course_id, http, aio if engine == "async" else None)
+            files = _CourseFileIndex(course, cache)
+            media_index = listing.result()
+        if not media_index.available:
+            print("⚠️  Could not list media objects; checking each embed instead.")
+
+        manifest = None
+        if manifest_dir:
+            manifest = _CourseManifest(course_id, manifest_dir, parser, rescan=full_rescan or refresh_cache)
+
+        media_checker = _MediaObjectChecker(cache, aio=aio if engine == "async" else None, index=media_index)
+        media_refs = {}
+        own_pool = bool(processes) and scan_pool is None
+        if own_pool:
+            scan_pool = _start_scan_pool(processes)
+
+        def _scan_item(kind, payload, location, updated_at=None):
+            if kind == "html" and manifest is not None:
+                fingerprint = manifest.fingerprint(payload, updated_at)
+                saved = manifest.lookup(location, fingerprint)
+                if saved is not None:
+                    for url, _ in saved["media_objects"]:
+                        media_checker.submit(url)
+                    return saved
+            scan = _new_scan()
+            refs = _FileRefRecorder(files, scan["file_refs"])
+            if kind == "module_item":
+                _process_module_item(payload, refs, location, scan["yt_links"], scan["link_media"], scan["lib_media"])
+            elif payload and scan_pool is not None:
+                scan, file_ids, events = scan_pool.submit(_scan_html_worker, payload, location, parser).result()
+                for event, fields in events:
+                    _trace(event, **fields)
+                for url, _ in scan["media_objects"]:
+                    media_checker.submit(url)
+                _resolve_file_links(scan, files, file_ids, location)
+            elif payload:
+                soup = _parse_html(payload, parser)
+                _process_html_with_accessibility(soup, refs, location, scan["yt_links"], scan["media_links"],
+                                                 scan["link_media"], scan["lib_media"], scan["accessibility_issues"],
+                                                 cache, _MediaRefRecorder(media_checker, scan["media_objects"]))
+            if kind == "html" and manifest is not None:
+                manifest.store(location, fingerprint, scan)
+            return scan
+
+        def _html_items(objs, attr):
+            for obj in objs:
+                yield "html", getattr(obj, attr, None), obj.html_url, getattr(obj, "updated_at", None)
+
+        def _syllabus():
+            try:
+                syllabus = canvas.get_course(course_id, include="syllabus_body")
+            except Exception as exc:
+                if _is_throttle_error(exc):
+                    raise
+                print("⚠️  Could not load syllabus.")
+                return
+            yield ("html", syllabus.syllabus_body, f"{CANVAS_API_URL}/courses/{course_id}/assignments/syllabus",
+                   getattr(syllabus, "updated_at", None))
+
+        def _modules():
+            for mod in course.get_modules():
+                for item in mod.get_module_items(include="content_details"):
+                    yield "module_item", item, f"{CANVAS_API_URL}/courses/{course_id}/modules/items/{item.id}", None
+
+        # --------------------------------------------------------------
+        # Scanning sections with printouts
+        # --------------------------------------------------------------
+        sources = [
+            ("Pages", lambda: (("html", body, p.html_url, getattr(p, "updated_at", None))
+                               for p, body in _pages_with_bodies(course))),
+            ("Assignments", lambda: _html_items(course.get_assignments(), "description")),
+            ("Discussions", lambda: _html_items(course.get_discussion_topics(), "message")),
+            ("Syllabus", _syllabus),
+            ("Modules", _modules),
+            ("Announcements", lambda: _html_items(course.get_discussion_topics(only_announcements=True), "message")),
+        ]
+        _enter_stage(course_id, "scan")
+        print("🔎 Scanning Pages, Assignments, Discussions, Syllabus, Modules and Announcements …")
+        try:
+            for scan in _scan_sources(sources, _scan_item, max(MAX_WORKERS, processes or 0)):
+                _merge_scan(scan, files, findings, course_id, yt_links, media_refs)
+                _report_issues(scan["accessibility_issues"])
+            if manifest is not None:
+                manifest.save()
+                print(f"♻️  Reused findings for {manifest.reused} unchanged items")
+
+            _enter_stage(course_id, "media_objects")
+            print(f"🎞️  Collecting {len(media_refs)} media object results …")
+            for url, locations in media_refs.items():
+                findings.add_media(course_id, "media", url,
+                                   _MediaEntry(media_checker.status(url), "", "", "", ", ".join(locations), ""))
+
+            _enter_stage(course_id, "pdfs")
+            print(f"🔎 Checking {len(files.by_mime_class.get('pdf', {}))} course PDFs …")
+            pdf_issues = []
+            _check_pdf_accessibility(files, pdf_issues, f"{CANVAS_API_URL}/courses/{course_id}/files", cache,
+                                     scan_pool, workers=max(MAX_WORKERS, processes or 0))
+            _report_issues(pdf_issues)
+        finally:
+            media_checker.close()
+            files.close()
+            if own_pool:
+                scan_pool.shutdown(wait=False)  # every task is done; let the workers exit in the background
+
+        # --------------------------------------------------------------
+        # YouTube processing
+        # --------------------------------------------------------------
+        _enter_stage(course_id, "youtube")
+        print("\n▶️  Checking YouTube captions …")
+        yt_tasks = []
+        for key, pages in yt_links.items():
+            link = _classify_url(key)
+            if link.kind == LINK_YOUTUBE_PLAYLIST:
+                status = "this is a playlist, check individual videos"
+            elif link.media_id:
+                yt_tasks.append((key, link.media_id, pages, YOUTUBE_API_KEY))
+                continue
+            else:
+                status = "Unable to parse Video ID"
+            findings.add_media(course_id, "youtube", key, _MediaEntry(status, "", "", "", ", ".join(pages), ""))
+
+        if yt_tasks:
+            for k, st, (h, m, s), pg in _check_youtube_batch(yt_tasks, cache, aio if engine == "async" else None):
+                findings.add_media(course_id, "youtube", k, _MediaEntry(st, h, m, s, ", ".join(pg), ""))
+        stats = counted.counters(since=counters_at_start)
+
+        # --------------------------------------------------------------
+        # Compile VAST results
+        # --------------------------------------------------------------
+        _enter_stage(course_id, "write")
+        print("\n📊 Compiling VAST results …")
+
+        # Check if there are any linked audio/video files
+        has_linked_files = next(findings.media(course_id, "linked_files"), None) is not None
+
+        rows = []
+        total_minutes = 0  # Track total duration
+    
+        for section in MEDIA_SECTIONS:
+            for found in findings.media(course_id, section):
+                # Consolidate time and get minutes for totaling
+                duration, minutes_to_add = _consolidate_time(found.hours, found.minutes, found.seconds)
+                total_minutes += minutes_to_add
+            
+                # Build row based on whether we have file locations
+                row = [found.media, found.status, duration, found.location]
+                if has_linked_files:
+                    row.append(found.file_location)
+                rows.append(row)
+
+        # Add total row
+        total_duration = _minutes_to_duration(total_minutes)
+        if has_linked_files:
+            total_row = ["Total Duration", "", total_duration, "", ""]
+        else:
+            total_row = ["Total Duration", "", total_duration, ""]
+    
+        rows.append(total_row)
 
-    # Write data to worksheets
-    print("📝 Writing VAST Report data...")
-    set_with_dataframe(vast_ws, vast_df)
+        # Define columns based on whether there are linked files
+        if has_linked_files:
+            columns = [
+                "Media", "Caption Status", "Duration (HH:MM)", "Location", "File Location"
+            ]
+        else:
+            columns = [
+                "Media", "Caption Status", "Duration (HH:MM)", "Location"
+            ]
+
+        print("📝 Writing VAST Report data...")
+        vast_out = report.table(VAST_TAB, columns)
+        vast_out.append(rows)
+        vast_out.close()
+
+        # --------------------------------------------------------------
+        # Finish Accessibility results
+        # --------------------------------------------------------------
+        print("\n♿ Finishing Accessibility results …")
+        severity_counts = findings.severity_counts(course_id)
+        error_count = severity_counts.get("Error", 0)
+        suggestion_count = severity_counts.get("Suggestion", 0)
+        review_count = severity_counts.get("Needs Review", 0)
+        issue_count = sum(severity_counts.values())
+
+        print("📝 Writing Accessibility Issues data...")
+        issues_out.flush()
+        issues_out.write_row(2, [
+            "SUMMARY",
+            f"Errors: {error_count}, Suggestions: {suggestion_count}, Needs Review: {review_count}",
+            f"Total Issues: {issue_count}",
+            ""
+        ])
+        issues_out.close()
+        report.close()
+        stages = _enter_stage(course_id, None)
+
+        print(f"\n✅ Report complete for: {course.name}")
+        print(f"📎 Google Sheet URL: {report.location}" if output == "sheets" else f"📎 Report: {report.location}")
+        print(f"⏱️  Total media duration: {total_duration}")
+        print(f"♿ Accessibility Issues Found:")
+        print(f"   🔴 Errors: {error_count}")
+        print(f"   🟡 Suggestions: {suggestion_count}")
+        print(f"   🔵 Needs Review: {review_count}")
+        print(f"   📊 Total: {issue_count}")
+        print(f"🌐 HTTP: {stats['requests']} requests, {stats['retries']} retries "
+              f"({stats['throttled']} throttled), {stats['bytes']:,} bytes")
+        print("⏱️  Stages: " + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in stages.items()))
+
+        return report.location
+    except BaseException as exc:
+        if report is not None:
+            report.abort()
+        if course_id in _stage_clocks:
+            _enter_stage(course_id, None, error=repr(exc))
+        raise
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if own_cache:
+            cache.close()
+        if own_aio:
+            aio.close()
+        remove_trace_hook(log)
+        if metrics_prom:
+            _write_prometheus(metrics_prom)
 
-    print("📝 Writing Accessibility Issues data...")
-    set_with_dataframe(accessibility_ws, accessibility_df)
+# ----------------------------------------------------------------------
+# BATCH MODE
+# ----------------------------------------------------------------------
+def _batch_course_ids(canvas, courses=None, term=None, account=None):
+    """Expand explicit course ids, a term and/or an account into course ids"""
+    course_ids = [_parse_course_id(c) for c in (courses or [])]
+    if term is not None or account is not None:
+        if account is not None:
+            accounts = [canvas.get_account(account)]
+        else:
+            accounts = [a for a in canvas.get_accounts() if getattr(a, "root_account_id", None) is None]
+        kwargs = {"enrollment_term_id": term} if term is not None else {}
+        for acct in accounts:
+            # Account course listings include courses in sub-accounts
+            course_ids.extend(str(c.id) for c in acct.get_courses(per_page=100, **kwargs))
+    return list(dict.fromkeys(course_ids))
+
+def _read_batch_progress(progress_path):
+    done = {}
+    if progress_path and os.path.exists(progress_path):
+        with open(progress_path) as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # partially written line from an interrupted run
+                if entry.get("status") == "done":
+                    done[entry["course_id"]] = entry.get("url")
+    return done
+
+def run_batch_report(courses=None, term=None, account=None, max_workers: int = BATCH_WORKERS,
+                     max_in_flight: int = MAX_WORKERS * 2, progress_path: str = BATCH_PROGRESS_PATH,
+                     refresh_cache: bool = False, cache_path: str = CACHE_PATH,
+                     parser: str = HTML_PARSER, manifest_dir: str = MANIFEST_DIR,
+                     full_rescan: bool = False, engine: str = "threads", output: str = OUTPUT,
+                     output_dir: str = OUTPUT_DIR, findings=None, metrics_log: str = METRICS_LOG,
+                     metrics_prom: str = METRICS_PROM, processes: int = SCAN_PROCESSES) -> dict:
+    """
+    Run the caption/accessibility report for many courses.
+
+    Courses come from ``courses`` (ids or URLs), every course in ``term``,
+    and/or every course in ``account`` (sub-accounts included).  Up to
+    ``max_workers`` courses run at once, all sharing one Canvas client,
+    report output, result cache and HTTP pool capped at ``max_in_flight``
+    concurrent requests (with ``engine="async"``, one event loop shared
+    by every course, with the same cap) and, with ``processes=N``, one
+    pool of N parse worker processes.  Each finished course is appended
+    to ``progress_path`` so an interrupted batch resumes where it stopped.
+    Pass a _FindingStore as ``findings`` to keep every course's findings
+    for lookups afterwards.  ``metrics_log`` and ``metrics_prom`` are as
+    for run_caption_report, covering the whole batch (the Prometheus file
+    is rewritten after every course).
+    Returns {course_id: sheet URL or report path} for every completed course.
+    """
+    _configure()
+    _check_parser(parser)
+    _check_engine(engine)
+    _check_output(output)
+    gc = _sheets_client() if output == "sheets" else None
+    sheet_index = _SheetIndex() if output == "sheets" else None
+    http = _get_http(max_in_flight)
+    http.limit(max_in_flight)
+    counters_at_start = http.counters()
+    canvas = _make_canvas(http)
+    aio = _AsyncHttp(max_in_flight=max_in_flight) if engine == "async" else None
+    cache = _ResultCache(cache_path, refresh=refresh_cache) if cache_path else None
+    scan_pool = _start_scan_pool(processes) if processes else None
+
+    course_ids = _batch_course_ids(canvas, courses, term, account)
+    completed = _read_batch_progress(progress_path)
+    pending = [c for c in course_ids if c not in completed]
+    print(f"📚 Batch: {len(course_ids)} courses, {len(course_ids) - len(pending)} already done, {len(pending)} to run")
+
+    log_lock = threading.Lock()
+
+    def _log(entry):
+        if not progress_path:
+            return
+        entry["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with log_lock, open(progress_path, "a") as fh:
+            fh.write(json.dumps(entry) + "\n")
 
-    print(f"\n✅ Report complete for: {course.name}")
-    print(f"📎 Google Sheet URL: {sh.url}")
-    print(f"⏱️  Total media duration: {total_duration}")
-    print(f"♿ Accessibility Issues Found:")
-    print(f"   🔴 Errors: {error_count}")
-    print(f"   🟡 Suggestions: {suggestion_count}")
-    print(f"   🔵 Needs Review: {review_count}")
-    print(f"   📊 Total: {len(accessibility_rows)-1}")  # -1 for summary row
+    def _run(course_id):
+        try:
+            url = run_caption_report(course_id, refresh_cache=refresh_cache, canvas=canvas, gc=gc, cache=cache,
+                                     parser=parser, manifest_dir=manifest_dir, full_rescan=full_rescan,
+                                     engine=engine, aio=aio, output=output, output_dir=output_dir,
+                                     sheet_index=sheet_index, findings=findings, metrics_log=None,
+                                     metrics_prom=metrics_prom, processes=processes, scan_pool=scan_pool)
+        except Exception as exc:
+            print(f"❌ Course {course_id} failed: {exc}")
+            _log({"course_id": course_id, "status": "failed", "error": str(exc)})
+            return course_id, None
+        _log({"course_id": course_id, "status": "done", "url": url})
+        return course_id, url
+
+    results = {c: completed[c] for c in course_ids if c in completed}
+    log = add_trace_hook(_JsonLog(metrics_log)) if metrics_log else None
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+            for course_id, url in ex.map(_run, pending):
+                if url is not None:
+                    results[course_id] = url
+        stats = http.counters(since=counters_at_start)
+        if aio is not None:
+            stats = {k: v + aio.counters()[k] for k, v in stats.items()}
+    finally:
+        remove_trace_hook(log)
+        if cache is not None:
+            cache.close()
+        if scan_pool is not None:
+            scan_pool.shutdown()
+        if aio is not None:
+            aio.close()
+
+    print(f"\n✅ Batch complete: {len(results)}/{len(course_ids)} courses")
+    print(f"🌐 HTTP: {stats['requests']} requests, {stats['retries']} retries "
+          f"({stats['throttled']} throttled), {stats['bytes']:,} bytes")
+    return results
 
-    return sh.url
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+def _build_arg_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=CONFIG_PATH, help="JSON file with CANVAS_API_URL, CANVAS_API_KEY, "
+                        "YOUTUBE_API_KEY (environment variables win)")
+    common.add_argument("--output", choices=OUTPUTS, default=OUTPUT)
+    common.add_argument("--output-dir", default=OUTPUT_DIR, help="where local report files go")
+    common.add_argument("--parser", choices=HTML_PARSERS, default=HTML_PARSER)
+    common.add_argument("--engine", choices=ENGINES, default="threads")
+    common.add_argument("--cache", default=CACHE_PATH, help="caption result cache file")
+    common.add_argument("--no-cache", action="store_true", help="do not read or write the caption cache")
+    common.add_argument("--refresh-cache", action="store_true", help="re-check every video")
+    common.add_argument("--manifest-dir", default=MANIFEST_DIR)
+    common.add_argument("--full-rescan", action="store_true", help="parse unchanged content too")
+    common.add_argument("--processes", type=int, default=SCAN_PROCESSES,
+                        help="parse and check HTML in this many worker processes (0: threads)")
+    common.add_argument("--metrics-log", default=METRICS_LOG, help="append stage timings and metrics as JSON lines")
+    common.add_argument("--metrics-prom", default=METRICS_PROM, help="write metrics as a Prometheus text file")
+
+    ap = argparse.ArgumentParser(prog="vast-udoit", description="Canvas caption and accessibility report")
+    commands = ap.add_subparsers(dest="command", required=True)
+    scan = commands.add_parser("scan", parents=[common], help="report on one or more courses")
+    scan.add_argument("courses", nargs="+", metavar="COURSE", help="course id or URL")
+    batch = commands.add_parser("batch", parents=[common], help="resumable report over many courses")
+    batch.add_argument("--course", dest="courses", action="append", metavar="COURSE")
+    batch.add_argument("--term", type=int)
+    batch.add_argument("--account", type=int)
+    batch.add_argument("--workers", type=int, default=BATCH_WORKERS, help="courses scanned at once")
+    batch.add_argument("--max-in-flight", type=int, default=MAX_WORKERS * 2, help="concurrent requests")
+    batch.add_argument("--progress", default=BATCH_PROGRESS_PATH)
+    return ap
+
+def main(argv=None):
+    """``vast-udoit`` entry point: python caption_report.py scan COURSE [COURSE ...]"""
+    args = _build_arg_parser().parse_args(argv)
+    try:
+        _configure(args.config)
+    except RuntimeError as exc:
+        raise SystemExit(f"vast-udoit: {exc}") from None
+    options = dict(refresh_cache=args.refresh_cache, cache_path=None if args.no_cache else args.cache,
+                   parser=args.parser, manifest_dir=args.manifest_dir, full_rescan=args.full_rescan,
+                   engine=args.engine, output=args.output, output_dir=args.output_dir,
+                   metrics_log=args.metrics_log, metrics_prom=args.metrics_prom, processes=args.processes)
+    if args.command == "batch":
+        if not (args.courses or args.term is not None or args.account is not None):
+            raise SystemExit("vast-udoit batch: give --course, --term and/or --account")
+        run_batch_report(courses=args.courses, term=args.term, account=args.account, max_workers=args.workers,
+                         max_in_flight=args.max_in_flight, progress_path=args.progress, **options)
+        return 0
+    for course in args.courses:
+        run_caption_report(course, **options)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
 
 # ----------------------------------------------------------------------
 # Usage example
 # ----------------------------------------------------------------------
-# Uncomment the line below to run the function
+# From a shell (nothing heavy is imported until a report starts):
+#   python caption_report.py scan 12345 --output csv
+#   python caption_report.py batch --account 1 --term 42 --output xlsx
+#
+# Or from a notebook, uncomment the line below to run the function
 # run_caption_report("your_course_id_here")
+# run_caption_report("your_course_id_here", engine="async")   # needs aiohttp
+# run_caption_report("your_course_id_here", output="xlsx")     # local file, no Google account
+#
+# Or audit many courses at once (resumable via vast_batch_progress.jsonl)
+# run_batch_report(courses=["12345", "67890"])
+# run_batch_report(account=1, term=42)
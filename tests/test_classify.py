@@ -0,0 +1,28 @@
+"""_classify_url: which links count as YouTube, library media and Canvas media objects."""
+import pytest
+
+import caption_report
+
+
+@pytest.mark.parametrize("url, kind, provider", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "youtube", "YouTube"),
+    ("https://youtu.be/dQw4w9WgXcQ", "youtube", "YouTube"),
+    ("https://fod.infobase.com/PortalPlaylists.aspx?wID=1", "library", "Films on Demand"),
+    ("https://fod-infobase-com.ezproxy.example.edu/p", "library", "Films on Demand"),
+    ("https://lib.example.edu/proxy/fod.infobase.com/a", "library", "Films on Demand"),
+    ("https://login.ezproxy.example.edu/login?url=https://hosted.panopto.com/x", "library", "Panopto"),
+    ("https://canvas.example.edu/media_objects_iframe/m-5Z1KqVhCJk9YWzL2", "media_object", "Canvas"),
+])
+def test_media_links(url, kind, provider):
+    link = caption_report._classify_url(url)
+    assert (link.kind, link.provider) == (kind, provider)
+
+
+@pytest.mark.parametrize("url", [
+    "https://blog.example.edu/posts/how-to-use-hosted-panopto-com",
+    "https://canvas.example.edu/courses/1/pages/fod-infobase-com-guide",
+    "https://example.org/notes/kanopystreaming-com",
+    "https://example.org/a.b/c",
+])
+def test_slugs_are_not_library_media(url):
+    assert caption_report._classify_url(url).kind == "other"
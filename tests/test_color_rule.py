@@ -0,0 +1,63 @@
+"""The colour-only emphasis check stays linear on large, deeply nested, style-heavy Word-pasted pages."""
+import collections
+
+import pytest
+from bs4 import Tag
+
+import caption_report
+
+
+def _word_pasted_page(sections):
+    """``sections`` nested, colour-styled Word blocks, each holding a run of styled spans"""
+    block = (
+        '<div class="WordSection1" style="color:#1F3864;mso-line-height-rule:exactly">'
+        '<p class="MsoNormal" style="margin-bottom:0in;line-height:normal">'
+        + "".join(
+            f'<span style="font-size:11.0pt;font-family:&quot;Calibri&quot;,sans-serif;color:#C00000">'
+            f'Reading {i}: chapter notes</span><span lang="EN-US"><o:p>&nbsp;</o:p></span>'
+            for i in range(10)
+        )
+        + '<span style="color:blue"><!--[if gte mso 9]><b>x</b><![endif]--></span></p>'
+    )
+    return block * sections + "</div>" * sections
+
+
+@pytest.fixture
+def color_pass(monkeypatch):
+    """Run the colour rule over a soup, counting its callbacks, findings and any re-serialising of elements"""
+    calls = collections.Counter()
+
+    def counted(name, method):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(Tag, "decode", counted("serialised", Tag.decode))
+    monkeypatch.setattr(Tag, "get_text", counted("serialised", Tag.get_text))
+
+    class CountingColorRule(caption_report._ColorRule):
+        start = counted("visits", caption_report._ColorRule.start)
+        text = counted("visits", caption_report._ColorRule.text)
+        end = counted("visits", caption_report._ColorRule.end)
+
+        def issue(self, issue_type, description, severity="Error"):
+            calls["findings"] += 1
+
+    def run(soup):
+        calls.clear()
+        caption_report._run_rule(CountingColorRule, soup, "page", None)
+        return dict(calls)
+
+    return run
+
+
+def test_color_rule_is_linear(color_pass):
+    small = color_pass(caption_report._parse_html(_word_pasted_page(300), "html.parser"))
+    large = color_pass(caption_report._parse_html(_word_pasted_page(600), "html.parser"))
+
+    assert small["findings"] == 300 * 10
+    assert large["findings"] == 2 * small["findings"]
+    assert large["visits"] <= 2 * small["visits"] + 2
+    # Summarising a subtree by serialising it again at every ancestor is what made the check quadratic
+    assert "serialised" not in small and "serialised" not in large
@@ -0,0 +1,22 @@
+"""Secrets are checked when a report starts, naming whichever are missing."""
+import pytest
+
+import caption_report
+
+
+def test_missing_secret_is_named(monkeypatch, tmp_path):
+    monkeypatch.setattr(caption_report, "_configured", False)
+    for name in caption_report.SECRET_NAMES:
+        monkeypatch.setenv(name, "x")
+    monkeypatch.delenv("CANVAS_API_KEY")
+    with pytest.raises(RuntimeError, match="Missing CANVAS_API_KEY:"):
+        caption_report._configure(str(tmp_path / "absent.json"))
+    assert not caption_report._configured
+
+
+def test_cli_exits_with_the_message(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(caption_report, "_configured", False)
+    for name in caption_report.SECRET_NAMES:
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(SystemExit, match="vast-udoit: Missing CANVAS_API_URL, CANVAS_API_KEY, YOUTUBE_API_KEY"):
+        caption_report.main(["scan", "1", "--config", str(tmp_path / "absent.json")])
@@ -0,0 +1,56 @@
+"""Linked Canvas files are resolved through a bounded per-run index."""
+from types import SimpleNamespace
+
+import caption_report
+
+
+class _Course:
+    def __init__(self, files):
+        self.files = {str(f.id): f for f in files}
+        self.fetched = []
+
+    def get_files(self):
+        return []
+
+    def get_file(self, file_id):
+        self.fetched.append(str(file_id))
+        return self.files[str(file_id)]
+
+
+def _file(file_id, mime_class="video", url="https://canvas.test/files/{}/download?verifier=v"):
+    return SimpleNamespace(id=file_id, display_name=f"{file_id}.mp4", mime_class=mime_class,
+                           url=url.format(file_id))
+
+
+def test_index_keeps_the_most_recently_used_files():
+    course = _Course([_file(i) for i in range(1, 5)])
+    files = caption_report._CourseFileIndex(course, size=2)
+    try:
+        for file_id in (1, 2, 1, 3):
+            files.get(file_id)
+        assert list(files.by_id) == ["1", "3"]
+        files.get(2)
+        assert course.fetched == ["1", "2", "3", "2"]
+        assert sorted(files.by_mime_class["video"]) == ["1", "2", "3"]
+    finally:
+        files.close()
+
+
+def test_cached_metadata_expires_sooner_than_results(tmp_path):
+    cache = caption_report._ResultCache(str(tmp_path / "cache.sqlite3"))
+    files = caption_report._CourseFileIndex(_Course([_file(7)]), cache=cache)
+    try:
+        files.get(7)
+        expires, = cache._conn.execute("SELECT expires FROM results WHERE kind = 'canvas_file'").fetchone()
+        assert expires < caption_report.time.time() + caption_report.CANVAS_FILE_TTL + 60
+    finally:
+        files.close()
+        cache.close()
+
+
+def test_files_without_a_url_are_skipped():
+    link_media = {}
+    caption_report._add_file_entry(link_media, _file(8, url=""), "page")
+    caption_report._add_file_entry(link_media, _file(9), "page")
+    assert list(link_media) == ["Linked Video File: 9.mp4"]
+    assert link_media["Linked Video File: 9.mp4"].file_location == "https://canvas.test/files/9/download"
@@ -0,0 +1,44 @@
+"""``import caption_report`` must stay cheap: the heavy dependencies load when a report starts."""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("bs4", "canvasapi", "gspread", "PyPDF2", "aiohttp")
+# Cold-start budget for the import, dependencies included (requests is the
+# only heavy one left; about 0.25 s on a laptop).  Generous, so a loaded CI
+# machine does not fail it, but far below eager bs4/canvasapi/Google imports.
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def test_import_skips_heavy_dependencies():
+    # A fresh interpreter, so modules other tests imported do not count
+    code = (
+        "import json, sys; import caption_report; "
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(out.stdout) == []
+
+
+def _import_seconds():
+    """Cumulative ``import caption_report`` time in a fresh interpreter, from -X importtime"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import caption_report"],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in out.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if fields[-1] == "caption_report":
+            return int(fields[1]) / 1e6
+    raise AssertionError("caption_report missing from -X importtime output")
+
+
+def test_import_time():
+    assert min(_import_seconds() for _ in range(3)) < IMPORT_BUDGET_SECONDS
+
+
+def test_console_entry_point():
+    out = subprocess.run([sys.executable, "-c", "import caption_report; caption_report.main(['--help'])"],
+                         cwd=ROOT, capture_output=True, text=True)
+    assert out.returncode == 0
+    assert out.stdout.startswith("usage: vast-udoit")
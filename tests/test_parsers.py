@@ -0,0 +1,52 @@
+"""Every backend in HTML_PARSERS reports the same findings for the corpus in tests/corpus."""
+import glob
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import caption_report
+
+CORPUS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "*.html")))
+
+FILES = {
+    "5001": SimpleNamespace(id=5001, display_name="lab-intro.mp4", mime_class="video",
+                            url="https://canvas.example.edu/files/5001/download?verifier=x"),
+    "5002": SimpleNamespace(id=5002, display_name="reading.pdf", mime_class="pdf",
+                            url="https://canvas.example.edu/files/5002/download?verifier=y"),
+}
+
+
+class _Files:
+    """Course file index stand-in that records references"""
+
+    def __init__(self):
+        self.references = []
+
+    def get_many(self, file_ids):
+        return {file_id: FILES[file_id] for file_id in file_ids if file_id in FILES}
+
+    def add_reference(self, file_id, location):
+        self.references.append((file_id, location))
+
+
+def _findings(html, parser):
+    scan = caption_report._new_scan()
+    files = _Files()
+    soup = caption_report._parse_html(html, caption_report._check_parser(parser))
+    caption_report._process_html_with_accessibility(
+        soup, files, "page", scan["yt_links"], scan["media_links"], scan["link_media"], scan["lib_media"],
+        scan["accessibility_issues"], None, caption_report._MediaRefRecorder(None, scan["media_objects"]))
+    scan["file_refs"] = files.references
+    return scan
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+@pytest.mark.parametrize("parser", [p for p in caption_report.HTML_PARSERS if p != "html.parser"])
+def test_parsers_agree(path, parser):
+    pytest.importorskip(parser)
+    with open(path, encoding="utf-8") as fh:
+        html = fh.read()
+    expected = _findings(html, "html.parser")
+    assert expected["accessibility_issues"]
+    assert _findings(html, parser) == expected
@@ -0,0 +1,14 @@
+"""Sheets cells that would parse as formulas are written as text."""
+import pytest
+
+import caption_report
+
+
+@pytest.mark.parametrize("value", ["=HYPERLINK(\"https://evil.test\")", "+1+1", "-cmd", "@SUM(A1)"])
+def test_formula_like_text_is_quoted(value):
+    assert caption_report._sheets_literal(value) == "'" + value
+
+
+@pytest.mark.parametrize("value", ["Lecture 1", "12", "", 3, None, "https://canvas.test/a=b"])
+def test_other_values_are_unchanged(value):
+    assert caption_report._sheets_literal(value) == value